@@ -0,0 +1,72 @@
+import json
+from datetime import datetime
+from typing import List, Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_async_db
+from app.dependencies.admin import require_admin
+from app.schemas.admin import SessionFilter, TerminateUsersRequest
+from app.services.session_admin import SessionAdminService
+from app.services.session_export import SessionExporter
+
+router = APIRouter(prefix="/api/admin", tags=["admin"], dependencies=[Depends(require_admin)])
+
+def _ndjson(rows: List[Row]) -> StreamingResponse:
+    """Stream one line per terminated session, then a summary line"""
+    
+    def lines():
+        for row in rows:
+            yield json.dumps({"session_id": row.id, "user_id": row.user_id}) + "\n"
+        yield json.dumps({"terminated": len(rows)}) + "\n"
+    
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+@router.post("/users/{user_id}/sessions/terminate")
+async def terminate_user_sessions(
+    user_id: int,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Terminate every active session of one user"""
+    return _ndjson(await SessionAdminService(db).terminate_for_user(user_id))
+
+@router.post("/sessions/terminate-users")
+async def terminate_sessions_for_users(
+    body: TerminateUsersRequest,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Terminate every active session of the listed users"""
+    return _ndjson(await SessionAdminService(db).terminate_for_users(body.user_ids))
+
+@router.post("/sessions/terminate-matching")
+async def terminate_matching_sessions(
+    session_filter: SessionFilter,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Terminate active sessions by IP address and/or device browser, OS and type"""
+    try:
+        rows = await SessionAdminService(db).terminate_matching(session_filter)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return _ndjson(rows)
+
+@router.get("/sessions/export")
+async def export_sessions(
+    format: Literal["ndjson", "csv"] = "ndjson",
+    user_id: Optional[int] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None
+):
+    """Stream session history, active, inactive and archived, as NDJSON or CSV"""
+    
+    # The exporter opens a short DB session per page rather than holding
+    # the request's session for the whole download
+    exporter = SessionExporter(user_id=user_id, since=since, until=until)
+    if format == "csv":
+        return StreamingResponse(
+            exporter.csv(),
+            media_type="text/csv",
+            headers={"Content-Disposition": 'attachment; filename="sessions.csv"'}
+        )
+    return StreamingResponse(exporter.ndjson(), media_type="application/x-ndjson")
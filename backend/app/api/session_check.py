@@ -1,31 +1,121 @@
+import asyncio
+import json
 from fastapi import APIRouter, Depends, Request
-from sqlalchemy.orm import Session
-from app.database import get_db
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import settings
+from app.database import AsyncSessionLocal, get_async_db
 from app.dependencies.auth import get_current_user
+from app.services.activity_buffer import activity_buffer
+from app.services.session_events import session_events
+from app.services.session_tokens import session_status, session_tokens
 from app.services.simple_session import SimpleSessionService
 from app.models.user import User
 
 router = APIRouter(prefix="/api/session", tags=["session-check"])
 
+TERMINATED_MESSAGE = "Session terminated by another device"
+
 @router.get("/validate")
-def validate_session(
+async def validate_session(
     request: Request,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Check if current session is still valid"""
     
+    token = request.headers.get("x-session-token")
+    if token is not None:
+        return await _validate_token(token, current_user, db)
+    
+    # Clients without a session token: match the caller's browser against
+    # the user's active sessions
     service = SimpleSessionService(db)
-    active_sessions = service.get_active_sessions(current_user.id)
+    active_sessions = await service.get_active_session_browsers(current_user.id)
     
     # Get current device info
     user_agent = request.headers.get("user-agent", "")
     
     # Check if any active session matches current device
-    for session in active_sessions:
-        session_ua = session.device_info.get("browser", "") if isinstance(session.device_info, dict) else ""
+    for session_id, session_ua in active_sessions.items():
         if user_agent and session_ua in user_agent:
-            return {"valid": True, "session_id": session.id}
+            # An open tab validating is activity; keeps the sweeper off it
+            activity_buffer.record(current_user.id, session_id)
+            return {"valid": True, "session_id": session_id}
     
     # No matching session found - user was logged out
-    return {"valid": False, "message": "Session terminated by another device"}
\ No newline at end of file
+    return {"valid": False, "message": TERMINATED_MESSAGE}
+
+async def _validate_token(token: str, current_user: User, db: AsyncSession) -> dict:
+    """Validate a signed session token, touching the DB only on a status cache miss"""
+    claims = session_tokens.verify(token)
+    if claims is None or claims.user_id != current_user.id:
+        return {"valid": False, "message": TERMINATED_MESSAGE}
+    
+    active = session_status.get(claims.session_id)
+    if active is None:
+        active = await SimpleSessionService(db).is_session_active(current_user.id, claims.session_id)
+        session_status.record(claims.session_id, active)
+    if not active:
+        return {"valid": False, "message": TERMINATED_MESSAGE}
+    
+    activity_buffer.record(current_user.id, claims.session_id)
+    result = {"valid": True, "session_id": claims.session_id}
+    if session_tokens.needs_refresh(claims):
+        result["session_token"] = session_tokens.issue(claims.session_id, current_user.id)
+    return result
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@router.get("/events")
+async def session_events_stream(
+    session_id: str,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Server-sent events stream that pushes a `terminated` event for this session"""
+    
+    user_id = current_user.id
+    # The stream can stay open for hours; release the request's pooled
+    # connection (shared with get_current_user) before it starts
+    await db.close()
+    
+    async def stream():
+        # Subscribe here, not in the handler, so a client gone before the body
+        # starts leaves no queue behind; and before checking, so a
+        # termination racing the open is not lost
+        queue = session_events.subscribe(session_id)
+        try:
+            async with AsyncSessionLocal() as check_db:
+                active = await SimpleSessionService(check_db).is_session_active(user_id, session_id)
+            if not active:
+                yield _sse("terminated", {"type": "terminated", "session_id": session_id, "reason": "inactive", "message": TERMINATED_MESSAGE})
+                return
+            # An open stream means an open tab; count it as activity
+            activity_buffer.record(user_id, session_id)
+            yield _sse("ready", {"session_id": session_id})
+            # Events only reach subscribers on the node that ended the session,
+            # so streams are recycled; reconnecting re-runs the check above
+            deadline = asyncio.get_running_loop().time() + settings.session_events_max_stream_seconds
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=settings.session_events_keepalive_seconds)
+                except asyncio.TimeoutError:
+                    if asyncio.get_running_loop().time() >= deadline:
+                        return
+                    # Comment line keeps proxies from closing an idle stream
+                    activity_buffer.record(user_id, session_id)
+                    yield ": keepalive\n\n"
+                    continue
+                yield _sse(event["type"], {**event, "message": TERMINATED_MESSAGE})
+                if event["type"] == "terminated":
+                    return
+        finally:
+            session_events.unsubscribe(session_id, queue)
+    
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -1,18 +1,25 @@
 from typing import List
 from fastapi import APIRouter, Depends, HTTPException, Request
-from sqlalchemy.orm import Session
-from app.database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_async_db
 from app.dependencies.auth import get_current_user
+from app.dependencies.rate_limit import limit_session_creation
+from app.services.activity_buffer import activity_buffer
 from app.services.simple_session import SimpleSessionService
 from app.models.user import User
+from app.responses import ORJSONResponse
+import logging
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/sessions", tags=["sessions"])
 
-@router.post("/create")
-def create_session(
+# Route dependencies run before get_current_user and get_async_db
+@router.post("/create", dependencies=[Depends(limit_session_creation)])
+async def create_session(
     request: Request,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create new session and check device limit"""
     
@@ -20,20 +27,20 @@ def create_session(
     user_agent = request.headers.get("user-agent", "Unknown Browser")
     client_ip = request.client.host if request.client else "unknown"
     
-    result = service.create_session(
+    result = await service.create_session(
         user=current_user,
         device_info=user_agent,
         ip_address=client_ip
     )
     
-    return result
+    return ORJSONResponse(result)
 
-@router.post("/force-create")
-def force_create_session(
+@router.post("/force-create", dependencies=[Depends(limit_session_creation)])
+async def force_create_session(
     request: Request,
     force_data: dict,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Force create session by terminating selected session"""
     
@@ -41,27 +48,36 @@ def force_create_session(
     if not force_session_id:
         raise HTTPException(status_code=400, detail="session_id required")
     
+    # Read before the service can roll back and expire current_user
+    user_id = current_user.id
     service = SimpleSessionService(db)
     
-    print(f"Force terminating session: {force_session_id} for user: {current_user.id}")
-    
-    # Terminate the selected session FIRST
-    terminated = service.terminate_session(current_user.id, force_session_id)
-    if not terminated:
-        raise HTTPException(status_code=404, detail="Session not found")
-    
-    print(f"Session {force_session_id} terminated successfully")
-    
-    # Now create new session (this should work since we freed up a slot)
+    # Terminate the selected session and create the new one in one transaction
     user_agent = request.headers.get("user-agent", "Unknown Browser")
     client_ip = request.client.host if request.client else "unknown"
     
-    result = service.create_session(
+    result = await service.create_session(
         user=current_user,
         device_info=user_agent,
         ip_address=client_ip,
-        force_create=True
+        force_session_id=force_session_id
     )
+    if result["status"] == "session_not_found":
+        raise HTTPException(status_code=404, detail="Session not found")
+    
+    logger.debug("Force-create finished", extra={"user_id": user_id, "status": result["status"]})
+    return ORJSONResponse(result)
+
+@router.post("/heartbeat")
+async def session_heartbeat(
+    heartbeat_data: dict,
+    current_user: User = Depends(get_current_user)
+):
+    """Record session activity; written to the database in batches"""
+    
+    session_id = heartbeat_data.get("session_id")
+    if not session_id:
+        raise HTTPException(status_code=400, detail="session_id required")
     
-    print(f"New session creation result: {result}")
-    return result
\ No newline at end of file
+    activity_buffer.record(current_user.id, session_id)
+    return {"status": "ok"}
@@ -1,33 +1,25 @@
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from app.database import get_db
-from app.dependencies.auth import get_current_user
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_async_db
+from app.dependencies.auth import get_current_user, user_cache
 from app.models.user import User
+from app.responses import ORJSONResponse
 from app.schemas.user import UserUpdate, UserResponse
 
 router = APIRouter(prefix="/api/users", tags=["users"])
 
 @router.get("/me", response_model=UserResponse)
-def get_current_user_profile(
+async def get_current_user_profile(
     current_user: User = Depends(get_current_user)
 ):
     """Get current authenticated user profile"""
-    return UserResponse(
-        id=current_user.id,
-        auth0_user_id=current_user.auth0_user_id,
-        email=current_user.email,
-        full_name=current_user.full_name,
-        phone_number=current_user.phone_number,
-        is_active=current_user.is_active,
-        created_at=current_user.created_at,
-        updated_at=current_user.updated_at
-    )
+    return ORJSONResponse(UserResponse.model_validate(current_user).model_dump())
 
 @router.put("/me", response_model=UserResponse)
-def update_user_profile(
+async def update_user_profile(
     user_update: UserUpdate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update current authenticated user profile"""
     if user_update.full_name is not None:
@@ -35,16 +27,8 @@ def update_user_profile(
     if user_update.phone_number is not None:
         current_user.phone_number = user_update.phone_number
     
-    db.commit()
-    db.refresh(current_user)
+    await db.commit()
+    user_cache.invalidate(current_user.auth0_user_id)
+    await db.refresh(current_user)
     
-    return UserResponse(
-        id=current_user.id,
-        auth0_user_id=current_user.auth0_user_id,
-        email=current_user.email,
-        full_name=current_user.full_name,
-        phone_number=current_user.phone_number,
-        is_active=current_user.is_active,
-        created_at=current_user.created_at,
-        updated_at=current_user.updated_at
-    )
\ No newline at end of file
+    return ORJSONResponse(UserResponse.model_validate(current_user).model_dump())
\ No newline at end of file
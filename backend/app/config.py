@@ -3,18 +3,79 @@ from pydantic_settings import BaseSettings
 class Settings(BaseSettings):
     # Database
     database_url: str = "sqlite:///./auth_app.db"
+    # Comma-separated read replicas; reads are routed there, writes to database_url
+    database_replica_urls: str = ""
     redis_url: str = "redis://localhost:6379/0"
+    redis_session_store_enabled: bool = False
+    # Engine profile: "sqlite", "server" or "auto" (picked from the URL scheme)
+    database_profile: str = "auto"
+    db_pool_size: int = 10
+    db_max_overflow: int = 20
+    db_pool_timeout_seconds: int = 30
+    db_pool_recycle_seconds: int = 1800
+    sqlite_busy_timeout_ms: int = 5000
+    sqlite_mmap_size: int = 268435456
     
     # Auth0 Configuration
     auth0_domain: str = ""
     auth0_audience: str = ""
     auth0_client_id: str = ""
     auth0_client_secret: str = ""
+    auth0_jwks_url: str = ""  # defaults to https://<domain>/.well-known/jwks.json
+    jwks_cache_ttl_seconds: int = 600
+    verified_token_cache_size: int = 10000
     
     # Application
     secret_key: str = "default-secret-key"
+    admin_api_key: str = ""  # empty disables the /api/admin endpoints
+    export_page_size: int = 5000
     MAX_DEVICES_PER_USER: int = 3
     session_timeout_minutes: int = 30
+    session_token_ttl_seconds: int = 86400
+    session_status_cache_seconds: int = 30
+    
+    # Background expiry of idle sessions (disable to run app.services.sweeper separately)
+    session_sweeper_enabled: bool = True
+    session_sweep_interval_seconds: int = 60
+    session_sweep_chunk_size: int = 500
+    session_events_keepalive_seconds: int = 25
+    session_events_max_stream_seconds: int = 300
+    
+    # Retention: inactive sessions older than this move to user_sessions_archive
+    session_retention_days: int = 90
+    session_archive_chunk_size: int = 1000
+    session_archive_pause_ms: int = 50
+    active_session_count_reconcile_chunk_size: int = 1000
+    
+    # Token-bucket throttling of session create/force-create, per user and per IP
+    rate_limit_enabled: bool = True
+    rate_limit_backend: str = "memory"  # "redis" shares buckets across API nodes
+    session_create_user_rate_per_minute: float = 10
+    session_create_user_burst: int = 5
+    session_create_ip_rate_per_minute: float = 120
+    session_create_ip_burst: int = 60
+    
+    # Write-behind buffering of last_activity heartbeats
+    activity_flush_interval_seconds: int = 10
+    activity_flush_max_entries: int = 1000
+    
+    # Logging: records go through a queue to a background writer thread
+    log_level: str = "INFO"
+    log_json: bool = True
+    log_queue_size: int = 10000
+    log_debug_sample_rate: float = 0.01
+    
+    # In-process cache of authenticated users, keyed by x-user-id
+    user_cache_ttl_seconds: int = 60
+    user_cache_max_size: int = 10000
+    
+    # In-process cache of device_profiles ids, keyed by profile hash
+    device_profile_cache_size: int = 10000
+    
+    # Startup warmup: preload configured dependencies (before fork under
+    # gunicorn --preload), then open pool connections and fetch JWKS per worker
+    warmup_enabled: bool = True
+    warmup_db_connections: int = 0  # 0 opens the engine's full pool size
     
     class Config:
         env_file = ".env"
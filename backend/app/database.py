@@ -1,15 +1,166 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
-import os
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from sqlalchemy.sql import Select
+from app.config import settings
+from app.services.metrics import metrics, pool_checkout_wait
+import random
+import time
 
-DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./auth_app.db")
+DATABASE_URL = settings.database_url
 
-engine = create_engine(
-    DATABASE_URL, connect_args= {"check_same_thread": False}
-)
+# Async drivers used by the request path for each sync URL scheme
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+}
+
+def to_async_url(url: str) -> str:
+    """Map a sync database URL onto its async driver"""
+    scheme, sep, rest = url.partition("://")
+    return f"{ASYNC_DRIVERS.get(scheme, scheme)}{sep}{rest}"
+
+class _TimedCheckout:
+    """Pool mixin recording how long each checkout waited for a connection"""
+    engine_label = ""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            pool_checkout_wait.observe(time.perf_counter() - start, self.engine_label)
+
+class TimedQueuePool(_TimedCheckout, QueuePool):
+    engine_label = "sync"
+
+class TimedAsyncAdaptedQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    engine_label = "async"
+
+def _sqlite_profile(is_async: bool) -> dict:
+    # One writer at a time anyway; a few pooled connections keep the
+    # per-connection pragmas from being re-run on every request
+    return {
+        "poolclass": TimedAsyncAdaptedQueuePool if is_async else TimedQueuePool,
+        "pool_size": 5,
+        "max_overflow": 10,
+        "pool_timeout": settings.db_pool_timeout_seconds,
+        "connect_args": {"check_same_thread": False},
+    }
+
+def _server_profile(is_async: bool) -> dict:
+    return {
+        "poolclass": TimedAsyncAdaptedQueuePool if is_async else TimedQueuePool,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout_seconds,
+        "pool_recycle": settings.db_pool_recycle_seconds,
+        "pool_pre_ping": True,
+    }
+
+ENGINE_PROFILES = {
+    "sqlite": _sqlite_profile,
+    "server": _server_profile,
+}
+
+def resolve_profile(url: str, name: str = settings.database_profile) -> str:
+    if name != "auto":
+        return name
+    return "sqlite" if url.startswith("sqlite") else "server"
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    """WAL lets validate reads run alongside session writes"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA mmap_size={int(settings.sqlite_mmap_size)}")
+    cursor.execute(f"PRAGMA busy_timeout={int(settings.sqlite_busy_timeout_ms)}")
+    cursor.close()
+
+def make_engine(url: str, is_async: bool = False):
+    """Create an engine configured by the profile for ``url``"""
+    profile = resolve_profile(url)
+    options = ENGINE_PROFILES[profile](is_async)
+    if url.endswith(":memory:") or url.endswith("://"):
+        # Every pooled connection would open its own empty in-memory database
+        options = {"connect_args": options.get("connect_args", {})}
+    engine = create_async_engine(url, **options) if is_async else create_engine(url, **options)
+    if profile == "sqlite":
+        sync_engine = engine.sync_engine if is_async else engine
+        event.listen(sync_engine, "connect", _apply_sqlite_pragmas)
+    return engine
+
+# Sync engine for migrations, scripts and the remaining sync dependencies
+engine = make_engine(DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine used by the API routers
+ASYNC_DATABASE_URL = to_async_url(DATABASE_URL)
+async_engine = make_engine(ASYNC_DATABASE_URL, is_async=True)
+
+# Read replicas, only ever used through RoutingSession
+replica_engines = [
+    make_engine(to_async_url(url.strip()), is_async=True)
+    for url in settings.database_replica_urls.split(",")
+    if url.strip()
+]
+
+# Session.info keys used by RoutingSession
+PINNED = "pinned_to_primary"
+REPLICA = "replica"
+
+class RoutingSession(Session):
+    """Sends plain SELECTs to a replica and everything else to the primary.
+
+    The first write (a flush, DML or SELECT .. FOR UPDATE) pins the session
+    to the primary for the rest of its life, so a request that writes reads
+    its own writes afterwards. ``use_primary`` pins it up front.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if not replica_engines or self.info.get(PINNED):
+            return async_engine.sync_engine
+        if self._flushing or not isinstance(clause, Select) or clause._for_update_arg is not None:
+            self.info[PINNED] = True
+            return async_engine.sync_engine
+        # One replica per session, so its reads see a single snapshot
+        replica = self.info.get(REPLICA)
+        if replica is None:
+            replica = self.info[REPLICA] = random.choice(replica_engines)
+        return replica.sync_engine
+
+def use_primary(db: AsyncSession) -> None:
+    """Route every later statement of this session to the primary"""
+    db.info[PINNED] = True
+
+def reads_from_replica(db: AsyncSession) -> bool:
+    """True when this session's next SELECT may be answered by a lagging replica"""
+    return bool(replica_engines) and not db.info.get(PINNED)
+
+AsyncSessionLocal = sessionmaker(
+    async_engine, class_=AsyncSession, sync_session_class=RoutingSession,
+    autoflush=False, expire_on_commit=False
+)
+
+async def dispose_engines() -> None:
+    """Close the primary and replica pools"""
+    for async_pool_engine in (async_engine, *replica_engines):
+        await async_pool_engine.dispose()
+
+def _checked_out():
+    pools = [("sync", engine.pool), ("async", async_engine.pool)]
+    pools.extend((f"replica{i}", replica.pool) for i, replica in enumerate(replica_engines))
+    for label, pool in pools:
+        if isinstance(pool, QueuePool):
+            yield {"engine": label}, pool.checkedout()
+
+metrics.register_collector(
+    "db_pool_checked_out", "gauge", "Connections currently checked out of the pool", _checked_out
+)
+
 Base = declarative_base()
 
 def get_db():
@@ -17,4 +168,8 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,19 @@
+import hmac
+from fastapi import HTTPException, Request, status
+from app.config import settings
+
+def require_admin(request: Request) -> None:
+    """Allow the request only with the configured x-admin-key"""
+    
+    if not settings.admin_api_key:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin API is disabled"
+        )
+    
+    provided = request.headers.get("x-admin-key", "")
+    if not hmac.compare_digest(provided.encode(), settings.admin_api_key.encode()):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Invalid admin key"
+        )
@@ -1,25 +1,59 @@
 from fastapi import Depends, HTTPException, status, Request
-from sqlalchemy.orm import Session
-from app.database import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
+from app.config import settings
+from app.database import get_async_db, reads_from_replica, use_primary
 from app.models.user import User
+from app.services.cache import TTLCache
+from app.services.metrics import metrics
 
-def get_current_user(
+# Column snapshots of users keyed by auth0 user id. A hit is rebuilt into a
+# fresh instance and attached to the request's session without a round
+# trip; PUT /api/users/me invalidates the entry.
+user_cache = TTLCache(
+    maxsize=settings.user_cache_max_size,
+    ttl=settings.user_cache_ttl_seconds
+)
+metrics.register_cache("user", user_cache)
+
+def _snapshot(user: User) -> dict:
+    return {column.key: getattr(user, column.key) for column in User.__table__.columns}
+
+def _from_snapshot(db: AsyncSession, snapshot: dict) -> User:
+    user = User(**snapshot)
+    make_transient_to_detached(user)
+    db.add(user)
+    return user
+
+async def get_current_user(
     request: Request,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> User:
     """Get current user from session"""
-    
+
     # Get user ID from request headers (sent by frontend)
     user_id = request.headers.get("x-user-id")
-    
+
     if not user_id:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Not authenticates, Only authenticated users are allowed"
         )
-    
+
+    snapshot = user_cache.get(user_id)
+    if snapshot is not None:
+        return _from_snapshot(db, snapshot)
+
     # Get user from database
-    user = db.query(User).filter(User.auth0_user_id == user_id).first()
+    result = await db.execute(select(User).where(User.auth0_user_id == user_id))
+    user = result.scalars().first()
+    if not user and reads_from_replica(db):
+        # An account created moments ago may not have reached the replica;
+        # creating it again would fail on the unique auth0_user_id
+        use_primary(db)
+        result = await db.execute(select(User).where(User.auth0_user_id == user_id))
+        user = result.scalars().first()
     if not user:
         # Create user if doesn't exist
         user = User(
@@ -29,7 +63,8 @@ def get_current_user(
             phone_number=""
         )
         db.add(user)
-        db.commit()
-        db.refresh(user)
-    
-    return user
\ No newline at end of file
+        await db.commit()
+        await db.refresh(user)
+
+    user_cache.set(user_id, _snapshot(user))
+    return user
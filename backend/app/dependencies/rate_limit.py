@@ -0,0 +1,23 @@
+import math
+from fastapi import HTTPException, Request, status
+from app.config import settings
+from app.services.rate_limit import get_session_rate_limiter
+
+async def limit_session_creation(request: Request) -> None:
+    """Reject session creation over the per-user or per-IP rate with 429.
+
+    Keys on the x-user-id header rather than the loaded user, so throttled
+    requests are turned away before any database work.
+    """
+    
+    if not settings.rate_limit_enabled:
+        return
+    
+    client_ip = request.client.host if request.client else "unknown"
+    retry_after = await get_session_rate_limiter().check(request.headers.get("x-user-id"), client_ip)
+    if retry_after:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many session requests, retry later",
+            headers={"Retry-After": str(math.ceil(retry_after))}
+        )
@@ -0,0 +1,107 @@
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+import json
+import logging
+import queue
+import random
+import sys
+from app.config import settings
+from app.services.metrics import metrics
+
+# Set per request by CorrelationIdMiddleware; "-" outside a request
+correlation_id: ContextVar[str] = ContextVar("correlation_id", default="-")
+
+# Attributes every LogRecord has; anything else came in through ``extra=``
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "correlation_id"}
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, with ``extra=`` fields inlined"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "correlation_id": getattr(record, "correlation_id", "-"),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS:
+                entry[key] = value
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+class RequestContextFilter(logging.Filter):
+    """Stamp the correlation id and sample DEBUG records on the calling thread"""
+
+    def __init__(self, debug_sample_rate: float):
+        super().__init__()
+        self.debug_sample_rate = debug_sample_rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno <= logging.DEBUG and random.random() >= self.debug_sample_rate:
+            return False
+        record.correlation_id = correlation_id.get()
+        return True
+
+class NonBlockingQueueHandler(QueueHandler):
+    """QueueHandler that drops records instead of blocking when the queue is full"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Render the traceback here; the listener thread only sees a copy
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.message = record.getMessage()
+        record.msg, record.args, record.exc_info = record.message, None, None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+_listener: Optional[QueueListener] = None
+queue_handler: Optional[NonBlockingQueueHandler] = None
+
+def configure_logging() -> None:
+    """Route the root logger through a queue to a background writer thread"""
+    global _listener, queue_handler
+    if _listener is not None:
+        return
+
+    writer = logging.StreamHandler(sys.stdout)
+    writer.setFormatter(JsonFormatter() if settings.log_json else logging.Formatter(
+        "%(asctime)s %(levelname)s %(name)s [%(correlation_id)s] %(message)s"
+    ))
+
+    queue_handler = NonBlockingQueueHandler(queue.Queue(maxsize=settings.log_queue_size))
+    queue_handler.addFilter(RequestContextFilter(settings.log_debug_sample_rate))
+
+    root = logging.getLogger()
+    root.handlers = [queue_handler]
+    root.setLevel(logging.INFO)
+    # LOG_LEVEL applies to our own loggers; drivers stay at INFO
+    logging.getLogger("app").setLevel(settings.log_level.upper())
+
+    _listener = QueueListener(queue_handler.queue, writer, respect_handler_level=True)
+    _listener.start()
+
+def shutdown_logging() -> None:
+    """Drain queued records and stop the writer thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+metrics.register_collector(
+    "log_records_dropped_total", "counter", "Log records dropped because the log queue was full",
+    lambda: [({}, queue_handler.dropped if queue_handler else 0)]
+)
@@ -1,8 +1,49 @@
+from contextlib import asynccontextmanager, suppress
+import asyncio
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.api import users, simple_sessions, session_check
+from fastapi.responses import PlainTextResponse
+from app.api import admin, users, simple_sessions, session_check
+from app.config import settings
+from app.database import async_engine, dispose_engines, replica_engines
+from app.logging_config import configure_logging, shutdown_logging
+from app.middleware.correlation import CorrelationIdMiddleware
+from app.middleware.metrics import MetricsMiddleware
+from app.responses import ORJSONResponse
+from app.services.activity_buffer import activity_buffer
+from app.services.metrics import instrument_engine, metrics
+from app.services.sweeper import session_sweeper
+from app.services.warmup import preload, warm_up
 
-app = FastAPI(title="Trivium API", version="1.0.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    configure_logging()
+    if settings.warmup_enabled:
+        await warm_up()
+    tasks = [asyncio.create_task(activity_buffer.run())]
+    # Expire idle sessions in the background instead of on every login
+    if settings.session_sweeper_enabled:
+        tasks.append(asyncio.create_task(session_sweeper.run()))
+    yield
+    for task in tasks:
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+    # Don't lose heartbeats buffered since the last flush
+    await activity_buffer.flush()
+    # Pooled aiosqlite connections each own a non-daemon thread
+    await dispose_engines()
+    shutdown_logging()
+
+# Runs once in the master when gunicorn preloads the app, before workers fork
+if settings.warmup_enabled:
+    preload()
+
+app = FastAPI(title="Trivium API", version="1.0.0", lifespan=lifespan, default_response_class=ORJSONResponse)
+
+# Count SQL statements and time per request
+for instrumented_engine in (async_engine, *replica_engines):
+    instrument_engine(instrumented_engine.sync_engine)
 
 # CORS middleware
 app.add_middleware(
@@ -12,11 +53,15 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(MetricsMiddleware)
+# Outermost, so every log record of a request carries its id
+app.add_middleware(CorrelationIdMiddleware)
 
 # Include routers
 app.include_router(users.router)
 app.include_router(simple_sessions.router)
 app.include_router(session_check.router)
+app.include_router(admin.router)
 
 @app.get("/")
 def root():
@@ -24,4 +69,8 @@ def root():
 
 @app.get("/health")
 def health():
-    return {"status": "healthy"}
\ No newline at end of file
+    return {"status": "healthy"}
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def prometheus_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
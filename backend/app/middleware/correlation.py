@@ -0,0 +1,35 @@
+import uuid
+from app.logging_config import correlation_id
+
+HEADER = b"x-request-id"
+
+class CorrelationIdMiddleware:
+    """Tag every log record of a request with its x-request-id.
+
+    An incoming id is reused so a request can be followed across services;
+    otherwise one is generated. The id is echoed in the response headers.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = next(
+            (value.decode("latin-1")[:128] for name, value in scope["headers"] if name == HEADER),
+            None
+        ) or uuid.uuid4().hex
+        token = correlation_id.set(request_id)
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                message.setdefault("headers", []).append((HEADER, request_id.encode("latin-1")))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            correlation_id.reset(token)
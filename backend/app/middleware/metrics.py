@@ -0,0 +1,45 @@
+import time
+from app.services.metrics import (
+    RequestStats,
+    request_db_queries,
+    request_db_seconds,
+    request_latency,
+    request_stats,
+)
+
+class MetricsMiddleware:
+    """Record latency and SQL work per route template.
+
+    Plain ASGI rather than BaseHTTPMiddleware so streaming responses are not
+    buffered and no extra task is spawned per request.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = request_stats.set(stats)
+        status = 500
+        start = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            request_stats.reset(token)
+            # The matched route's template keeps label cardinality bounded
+            route = getattr(scope.get("route"), "path", "unmatched")
+            request_latency.observe(elapsed, scope["method"], route, str(status))
+            request_db_queries.observe(stats.queries, route)
+            request_db_seconds.observe(stats.db_seconds, route)
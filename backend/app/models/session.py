@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, Boolean, JSON, ForeignKey, Integer
+from sqlalchemy import Column, String, DateTime, Boolean, JSON, ForeignKey, Integer, Index, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import uuid
@@ -10,7 +10,7 @@ class UserSession(Base):
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     session_token = Column(String, unique=True, nullable=False, index=True)
-    device_info = Column(JSON, nullable=False)
+    device_profile_id = Column(Integer, ForeignKey("device_profiles.id"), nullable=False, index=True)
     device_fingerprint = Column(String, nullable=False, index=True)
     ip_address = Column(String, nullable=False)
     is_active = Column(Boolean, default=True)
@@ -18,4 +18,66 @@ class UserSession(Base):
     last_activity = Column(DateTime(timezone=True), server_default=func.now())
     
     # Relationship
-    user = relationship("User", back_populates="sessions")
\ No newline at end of file
+    user = relationship("User", back_populates="sessions")
+    device_profile = relationship("DeviceProfile")
+    
+    # Hot queries only ever look at active rows, so the indexes are partial
+    # where the dialect supports it and inactive history stays out of them
+    __table_args__ = (
+        Index(
+            "ix_user_sessions_user_active_activity",
+            "user_id", "is_active", "last_activity",
+            postgresql_where=text("is_active"),
+            sqlite_where=text("is_active = 1"),
+        ),
+        Index(
+            "ix_user_sessions_active_activity",
+            "last_activity",
+            postgresql_where=text("is_active"),
+            sqlite_where=text("is_active = 1"),
+        ),
+        # Retention job: finds inactive sessions old enough to archive
+        Index(
+            "ix_user_sessions_inactive_activity",
+            "last_activity",
+            postgresql_where=text("NOT is_active"),
+            sqlite_where=text("is_active = 0"),
+        ),
+    )
+
+class DeviceProfile(Base):
+    """A distinct device document, shared by every session that reports it.
+
+    ``attributes`` is the device_info document as the session services build
+    it, minus the IP address, which sessions keep in their own column.
+    Rows are never updated, so a profile id can be cached indefinitely.
+    """
+    __tablename__ = "device_profiles"
+    
+    id = Column(Integer, primary_key=True)
+    profile_hash = Column(String(64), unique=True, nullable=False)
+    browser = Column(String)
+    os = Column(String)
+    device_type = Column(String)
+    attributes = Column(JSON, nullable=False)
+
+class ArchivedSession(Base):
+    """Inactive session moved out of user_sessions by the retention job.
+
+    The session token is not carried over; an archived session can never be
+    validated again.
+    """
+    __tablename__ = "user_sessions_archive"
+    
+    id = Column(String, primary_key=True)
+    user_id = Column(Integer, nullable=False)
+    device_profile_id = Column(Integer, nullable=False)
+    device_fingerprint = Column(String, nullable=False)
+    ip_address = Column(String, nullable=False)
+    created_at = Column(DateTime(timezone=True))
+    last_activity = Column(DateTime(timezone=True))
+    archived_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    __table_args__ = (
+        Index("ix_user_sessions_archive_user_created", "user_id", "created_at"),
+    )
@@ -12,6 +12,8 @@ class User(Base):
     full_name = Column(String, nullable=False)
     phone_number = Column(String, nullable=True)
     is_active = Column(Boolean, default=True)
+    # Maintained by app.services.session_writes; repaired by app.services.session_counts
+    active_session_count = Column(Integer, nullable=False, default=0, server_default="0")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
@@ -0,0 +1,14 @@
+from typing import Any
+import orjson
+from fastapi.responses import JSONResponse
+
+class ORJSONResponse(JSONResponse):
+    """JSON response rendered by orjson.
+
+    orjson serializes datetimes, UUIDs and dataclasses natively, so handlers
+    can return plain data without a jsonable_encoder pass. Returning an
+    instance directly also skips FastAPI's response_model re-validation.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
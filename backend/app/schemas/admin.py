@@ -0,0 +1,11 @@
+from typing import List, Optional
+from pydantic import BaseModel, Field
+
+class TerminateUsersRequest(BaseModel):
+    user_ids: List[int] = Field(..., min_length=1)
+
+class SessionFilter(BaseModel):
+    ip_address: Optional[str] = None
+    browser: Optional[str] = None
+    os: Optional[str] = None
+    device_type: Optional[str] = None
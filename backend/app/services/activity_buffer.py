@@ -0,0 +1,111 @@
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+import asyncio
+import logging
+from sqlalchemy import and_, bindparam, or_, update
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.services.metrics import metrics
+from app.models.session import UserSession
+
+logger = logging.getLogger(__name__)
+
+sessions_table = UserSession.__table__
+
+# One statement executed for the whole batch (executemany). Only ever
+# moves last_activity forward, so a heartbeat cannot age a session whose
+# stored timestamp is ahead of ours (rows once written in IST are 5.5h ahead)
+BULK_TOUCH = (
+    update(sessions_table)
+    .where(
+        and_(
+            sessions_table.c.id == bindparam("b_session_id"),
+            sessions_table.c.user_id == bindparam("b_user_id"),
+            sessions_table.c.is_active == True,
+            or_(
+                sessions_table.c.last_activity == None,
+                sessions_table.c.last_activity < bindparam("b_last_activity")
+            )
+        )
+    )
+    .values(last_activity=bindparam("b_last_activity"))
+)
+
+class ActivityBuffer:
+    """Write-behind buffer that coalesces last_activity heartbeats.
+
+    Heartbeats only update an in-memory map of session id -> latest
+    timestamp. The map is written in one bulk UPDATE every
+    ``flush_interval`` seconds, as soon as it holds ``max_entries``
+    sessions, before each expiry sweep and on shutdown.
+    """
+
+    def __init__(
+        self,
+        session_factory=AsyncSessionLocal,
+        flush_interval: Optional[float] = None,
+        max_entries: Optional[int] = None
+    ):
+        self.session_factory = session_factory
+        self.flush_interval = flush_interval or settings.activity_flush_interval_seconds
+        self.max_entries = max_entries or settings.activity_flush_max_entries
+        self._pending: Dict[str, Tuple[int, datetime]] = {}
+        self._flush_lock = asyncio.Lock()
+        self.flushed_total = 0
+
+    def record(self, user_id: int, session_id: str, at: Optional[datetime] = None) -> None:
+        """Remember the latest activity for a session; never touches the DB.
+        
+        Timestamps are naive UTC, the clock sessions are created with.
+        """
+        at = at or datetime.utcnow()
+        previous = self._pending.get(session_id)
+        if previous is None or previous[1] < at:
+            self._pending[session_id] = (user_id, at)
+        if len(self._pending) >= self.max_entries and not self._flush_lock.locked():
+            asyncio.get_running_loop().create_task(self.flush())
+
+    async def flush(self) -> int:
+        """Write all buffered timestamps and return how many sessions were touched"""
+        async with self._flush_lock:
+            if not self._pending:
+                return 0
+            batch, self._pending = self._pending, {}
+            params = [
+                {"b_session_id": session_id, "b_user_id": user_id, "b_last_activity": at}
+                for session_id, (user_id, at) in batch.items()
+            ]
+            try:
+                async with self.session_factory() as db:
+                    await db.execute(BULK_TOUCH, params)
+                    await db.commit()
+            except Exception as e:
+                # Put the batch back unless newer heartbeats arrived meanwhile
+                for session_id, entry in batch.items():
+                    newer = self._pending.get(session_id)
+                    if newer is None or newer[1] < entry[1]:
+                        self._pending[session_id] = entry
+                logger.error(f"Activity flush failed: {e}")
+                return 0
+            self.flushed_total += len(params)
+            return len(params)
+
+    async def run(self) -> None:
+        """Flush every interval until cancelled"""
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+activity_buffer = ActivityBuffer()
+
+metrics.register_collector(
+    "activity_buffer_pending", "gauge", "Sessions with a heartbeat waiting to be flushed",
+    lambda: [({}, len(activity_buffer))]
+)
+metrics.register_collector(
+    "activity_buffer_flushed_total", "counter", "Session heartbeats written by bulk flushes",
+    lambda: [({}, activity_buffer.flushed_total)]
+)
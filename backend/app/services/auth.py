@@ -1,69 +1,152 @@
-import jwt
-import requests
-from typing import Optional
+import hashlib
+import threading
+import time
+from typing import Any, Dict, Optional
 from app.config import settings
 from app.schemas.auth import TokenPayload
+from app.services.cache import TTLCache
+from app.services.metrics import metrics
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Minimum gap between refreshes forced by a token signed with an unknown kid,
+# so garbage tokens cannot turn into a JWKS request each
+UNKNOWN_KID_REFRESH_INTERVAL = 30
+
 class Auth0Validator:
-    def __init__(self):
-        self.domain = settings.auth0_domain
-        self.audience = settings.auth0_audience
-        self._jwks_cache = None
-        logger.info(f"Auth0Validator initialized with domain: {self.domain}, audience: {self.audience}")
-    
-    def get_jwks(self):
+    def __init__(
+        self,
+        domain: Optional[str] = None,
+        audience: Optional[str] = None,
+        jwks_url: Optional[str] = None,
+        jwks_ttl: Optional[int] = None,
+        token_cache_size: Optional[int] = None
+    ):
+        self.domain = domain if domain is not None else settings.auth0_domain
+        self.audience = audience if audience is not None else settings.auth0_audience
+        self.jwks_url = (
+            jwks_url
+            or settings.auth0_jwks_url
+            or f"https://{self.domain}/.well-known/jwks.json"
+        )
+        self.jwks_ttl = jwks_ttl if jwks_ttl is not None else settings.jwks_cache_ttl_seconds
+
+        # kid -> parsed public key, replaced wholesale on every refresh
+        self._signing_keys: Dict[str, Any] = {}
+        self._keys_expire_at = 0.0
+        self._last_fetch_at = 0.0
+        self._fetch_lock = threading.Lock()
+        self._background_refresh = threading.Lock()
+
+        # sha256(token) -> TokenPayload, valid until exp but at most one JWKS TTL
+        self._verified_tokens = TTLCache(
+            maxsize=token_cache_size or settings.verified_token_cache_size,
+            ttl=self.jwks_ttl
+        )
+        logger.info("Auth0Validator initialized", extra={"domain": self.domain, "audience": self.audience})
+
+    def get_jwks(self) -> Dict:
         """Fetch Auth0 public keys for token validation"""
-        if not self._jwks_cache:
+        # Deferred so importing the app does not pay for requests/urllib3
+        import requests
+        try:
+            logger.info(f"Fetching JWKS from: {self.jwks_url}")
+            response = requests.get(self.jwks_url, timeout=10)
+            response.raise_for_status()
+            jwks = response.json()
+            logger.info("JWKS fetched successfully", extra={"key_count": len(jwks.get('keys', []))})
+            return jwks
+        except Exception as e:
+            logger.error(f"Failed to fetch JWKS: {e}")
+            raise
+
+    def refresh_signing_keys(self, force: bool = False) -> None:
+        """Reload the kid -> key map, letting only one caller fetch at a time"""
+        requested_at = time.monotonic()
+        with self._fetch_lock:
+            # Whoever held the lock before us may already have refreshed
+            if self._last_fetch_at >= requested_at:
+                return
+            # An empty key set is cached for the TTL as well
+            if not force and requested_at < self._keys_expire_at:
+                return
+            jwks = self.get_jwks()
+            import jwt
+            self._signing_keys = {
+                jwk["kid"]: jwt.algorithms.RSAAlgorithm.from_jwk(jwk)
+                for jwk in jwks.get("keys", [])
+                if jwk.get("kty") == "RSA" and "kid" in jwk
+            }
+            self._last_fetch_at = time.monotonic()
+            self._keys_expire_at = self._last_fetch_at + self.jwks_ttl
+
+    def _refresh_in_background(self) -> None:
+        """Refresh expired keys off the request path, serving the stale map meanwhile"""
+        if not self._background_refresh.acquire(blocking=False):
+            return
+
+        def run():
             try:
-                jwks_url = f"https://{self.domain}/.well-known/jwks.json"
-                logger.info(f"Fetching JWKS from: {jwks_url}")
-                response = requests.get(jwks_url, timeout=10)
-                response.raise_for_status()
-                self._jwks_cache = response.json()
-                logger.info("JWKS fetched successfully", extra={"key_count": len(self._jwks_cache.get('keys', []))})
-
-            except Exception as e:
-                logger.error(f"Failed to fetch JWKS: {e}")
-                raise
-        return self._jwks_cache
-    
+                self.refresh_signing_keys()
+            except Exception:
+                # Keep serving the previous keys; the next lookup retries
+                pass
+            finally:
+                self._background_refresh.release()
+
+        threading.Thread(target=run, name="jwks-refresh", daemon=True).start()
+
+    def get_signing_key(self, kid: Optional[str]) -> Optional[Any]:
+        """Return the parsed public key for a kid, fetching the JWKS if needed"""
+        if not self._last_fetch_at:
+            self.refresh_signing_keys()
+        elif time.monotonic() >= self._keys_expire_at:
+            self._refresh_in_background()
+
+        key = self._signing_keys.get(kid)
+        if key is None and time.monotonic() - self._last_fetch_at >= UNKNOWN_KID_REFRESH_INTERVAL:
+            # Possibly a freshly rotated key
+            self.refresh_signing_keys(force=True)
+            key = self._signing_keys.get(kid)
+        return key
+
     def verify_token(self, token: str) -> Optional[TokenPayload]:
         """Validate JWT token and return payload"""
+        import jwt
+        digest = hashlib.sha256(token.encode()).hexdigest()
+        cached = self._verified_tokens.get(digest)
+        if cached is not None:
+            return cached
+
         try:
-            logger.info("Starting token verification")
-            
+            logger.debug("Starting token verification")
+
             # Get signing key
             unverified_header = jwt.get_unverified_header(token)
-            logger.info("Token header received", extra={"algorithm": unverified_header.get('alg'), "type": unverified_header.get('typ')})
+            logger.debug("Token header received", extra={"algorithm": unverified_header.get('alg'), "type": unverified_header.get('typ')})
 
-            
-            jwks = self.get_jwks()
-            
-            # Find the correct key
-            key = None
-            for jwk in jwks["keys"]:
-                if jwk["kid"] == unverified_header["kid"]:
-                    key = jwt.algorithms.RSAAlgorithm.from_jwk(jwk)
-                    break
-            
+            key = self.get_signing_key(unverified_header.get("kid"))
             if not key:
                 logger.error(f"No matching key found for kid: {str(unverified_header.get('kid', 'None'))[:50]}")
+                return None
 
-            
-            # Verify and decode token
+            # Verify and decode token; exp is required, it bounds the cache entry
             payload = jwt.decode(
                 token,
                 key,
                 algorithms=["RS256"],
                 audience=self.audience,
-                issuer=f"https://{self.domain}/"
+                issuer=f"https://{self.domain}/",
+                options={"require": ["exp"]}
             )
-            
+
             logger.info("Token verified successfully", extra={"user_id": payload.get('sub')})
-            return TokenPayload(**payload)
+            token_payload = TokenPayload(**payload)
+            self._verified_tokens.set(
+                digest, token_payload, ttl=min(payload["exp"] - time.time(), self.jwks_ttl)
+            )
+            return token_payload
 
         except jwt.ExpiredSignatureError:
             logger.error("Token has expired")
@@ -75,4 +158,12 @@ class Auth0Validator:
             logger.error(f"Token verification failed: {e}")
             return None
 
-auth_validator = Auth0Validator()
\ No newline at end of file
+_auth_validator: Optional[Auth0Validator] = None
+
+def get_auth_validator() -> Auth0Validator:
+    """Shared validator, built on first use rather than at import time"""
+    global _auth_validator
+    if _auth_validator is None:
+        _auth_validator = Auth0Validator()
+        metrics.register_cache("verified_token", _auth_validator._verified_tokens)
+    return _auth_validator
@@ -0,0 +1,72 @@
+from typing import Dict, Optional, Tuple
+import hashlib
+import json
+import logging
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+from app.config import settings
+from app.database import AsyncSessionLocal, use_primary
+from app.models.session import DeviceProfile
+from app.services.cache import TTLCache
+from app.services.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+def normalize_profile(device_info: Dict) -> Tuple[Dict, str]:
+    """Profile document for a session's device_info and the hash that keys it.
+
+    The IP address is per session and lives in user_sessions.ip_address, so
+    it is left out; everything else is hashed as canonical JSON.
+    """
+    attributes = {key: value for key, value in device_info.items() if key != "ip_address"}
+    canonical = json.dumps(attributes, sort_keys=True, separators=(",", ":"))
+    return attributes, hashlib.sha256(canonical.encode()).hexdigest()
+
+class DeviceProfileResolver:
+    """Maps device_info documents to device_profiles ids.
+
+    Ids are cached by profile hash; a miss looks the profile up on the
+    primary and inserts it if it is new. The insert commits in its own short
+    transaction, so a cached id never points at a rolled-back row, and a
+    concurrent insert of the same profile is resolved by the unique hash.
+    """
+
+    def __init__(self, session_factory=AsyncSessionLocal, maxsize: Optional[int] = None):
+        self.session_factory = session_factory
+        self._ids = TTLCache(maxsize=maxsize or settings.device_profile_cache_size, ttl=float("inf"))
+
+    async def resolve(self, device_info: Dict) -> int:
+        attributes, profile_hash = normalize_profile(device_info)
+        profile_id = self._ids.get(profile_hash)
+        if profile_id is None:
+            profile_id = await self._get_or_create(attributes, profile_hash)
+            self._ids.set(profile_hash, profile_id)
+        return profile_id
+
+    async def _get_or_create(self, attributes: Dict, profile_hash: str) -> int:
+        lookup = select(DeviceProfile.id).where(DeviceProfile.profile_hash == profile_hash)
+        async with self.session_factory() as db:
+            use_primary(db)
+            profile_id = (await db.execute(lookup)).scalar()
+            if profile_id is not None:
+                return profile_id
+            try:
+                result = await db.execute(
+                    insert(DeviceProfile).values(
+                        profile_hash=profile_hash,
+                        browser=attributes.get("browser"),
+                        os=attributes.get("os", attributes.get("operating_system")),
+                        device_type=attributes.get("device_type"),
+                        attributes=attributes
+                    )
+                )
+                await db.commit()
+            except IntegrityError:
+                # Another worker inserted the same profile first
+                await db.rollback()
+                return (await db.execute(lookup)).scalar_one()
+            logger.info("Device profile created", extra={"device_profile_id": result.inserted_primary_key[0]})
+            return result.inserted_primary_key[0]
+
+device_profiles = DeviceProfileResolver()
+metrics.register_cache("device_profiles", device_profiles._ids)
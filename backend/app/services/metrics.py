@@ -0,0 +1,154 @@
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+import threading
+import time
+from sqlalchemy import event
+from app.services.cache import TTLCache
+
+# (labels, value) pairs reported by a collector for one metric
+Samples = Iterable[Tuple[Dict[str, str], float]]
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 50)
+POOL_WAIT_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+CACHE_STATS = (("size", "gauge"), ("hits", "counter"), ("misses", "counter"), ("evictions", "counter"))
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+class Histogram:
+    """Cumulative Prometheus histogram with a fixed label set"""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str], buckets: Sequence[float]):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # label values -> [per-bucket counts..., +Inf count, sum]
+        self._series: Dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labelvalues: str) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                series = self._series[labelvalues] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = {key: list(series) for key, series in self._series.items()}
+        for labelvalues, series in sorted(snapshot.items()):
+            labels = dict(zip(self.labelnames, labelvalues))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _format_value(bound)
+                lines.append(f"{self.name}_bucket{_format_labels({**labels, 'le': le})} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(series[-1])}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {cumulative}")
+        return lines
+
+class MetricsRegistry:
+    """Histograms recorded on the request path plus pull-time collectors"""
+
+    def __init__(self):
+        self._histograms: List[Histogram] = []
+        # name -> (type, help, callable returning samples)
+        self._collectors: Dict[str, Tuple[str, str, Callable[[], Samples]]] = {}
+        self._caches: Dict[str, TTLCache] = {}
+
+    def histogram(self, name: str, help: str, labelnames: Sequence[str], buckets: Sequence[float]) -> Histogram:
+        histogram = Histogram(name, help, labelnames, buckets)
+        self._histograms.append(histogram)
+        return histogram
+
+    def register_collector(self, name: str, kind: str, help: str, collect: Callable[[], Samples]) -> None:
+        """Report ``collect()`` as a gauge or counter whenever /metrics is scraped"""
+        self._collectors[name] = (kind, help, collect)
+
+    def register_cache(self, cache_name: str, cache: TTLCache) -> None:
+        """Export size, hits, misses and evictions of a TTLCache"""
+        self._caches[cache_name] = cache
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for histogram in self._histograms:
+            lines.extend(histogram.render())
+        for name, (kind, help, collect) in self._collectors.items():
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in collect():
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        cache_stats = {name: cache.stats() for name, cache in self._caches.items()}
+        for stat, kind in CACHE_STATS:
+            name = "cache_size" if stat == "size" else f"cache_{stat}_total"
+            lines.append(f"# HELP {name} In-process cache {stat}")
+            lines.append(f"# TYPE {name} {kind}")
+            for cache_name, stats in cache_stats.items():
+                lines.append(f"{name}{_format_labels({'cache': cache_name})} {stats[stat]}")
+        return "\n".join(lines) + "\n"
+
+metrics = MetricsRegistry()
+
+request_latency = metrics.histogram(
+    "http_request_duration_seconds",
+    "Time from request start to the end of the response body",
+    ("method", "route", "status"),
+    LATENCY_BUCKETS
+)
+request_db_queries = metrics.histogram(
+    "http_request_db_queries",
+    "SQL statements executed per request",
+    ("route",),
+    QUERY_COUNT_BUCKETS
+)
+request_db_seconds = metrics.histogram(
+    "http_request_db_seconds",
+    "Time spent executing SQL per request",
+    ("route",),
+    LATENCY_BUCKETS
+)
+
+pool_checkout_wait = metrics.histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a pooled connection",
+    ("engine",),
+    POOL_WAIT_BUCKETS
+)
+
+class RequestStats:
+    """Database work attributed to the current request"""
+    __slots__ = ("queries", "db_seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+
+request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._metrics_started = time.perf_counter()
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = request_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_seconds += time.perf_counter() - getattr(context, "_metrics_started", time.perf_counter())
+
+def instrument_engine(engine) -> None:
+    """Count statements and DB time of a sync Engine into the current request"""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
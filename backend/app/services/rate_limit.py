@@ -0,0 +1,164 @@
+from collections import Counter
+from typing import TYPE_CHECKING, NamedTuple, Optional, Sequence, Tuple
+import logging
+import time
+from app.config import settings
+from app.services.cache import TTLCache
+from app.services.metrics import metrics
+
+if TYPE_CHECKING:
+    import redis.asyncio as redis
+
+logger = logging.getLogger(__name__)
+
+# KEYS = bucket hashes, ARGV = refill rate (tokens/second) and capacity of
+# each bucket in turn. Takes one token from every bucket only if all of them
+# have one; otherwise takes none and returns the 1-based index of the bucket
+# with the longest wait and that wait in seconds ({0, "0"} when allowed).
+# Uses the server clock so every node agrees on time.
+TAKE_SCRIPT = """
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) + tonumber(now_parts[2]) / 1000000
+local tokens = {}
+local blocked, longest = 0, 0
+for i = 1, #KEYS do
+    local rate = tonumber(ARGV[2 * i - 1])
+    local capacity = tonumber(ARGV[2 * i])
+    local state = redis.call('HMGET', KEYS[i], 'tokens', 'ts')
+    local ts = tonumber(state[2]) or now
+    tokens[i] = math.min(capacity, (tonumber(state[1]) or capacity) + math.max(0, now - ts) * rate)
+    if tokens[i] < 1 and (1 - tokens[i]) / rate > longest then
+        blocked, longest = i, (1 - tokens[i]) / rate
+    end
+end
+if blocked > 0 then
+    return {blocked, tostring(longest)}
+end
+for i = 1, #KEYS do
+    local rate = tonumber(ARGV[2 * i - 1])
+    local capacity = tonumber(ARGV[2 * i])
+    redis.call('HSET', KEYS[i], 'tokens', tostring(tokens[i] - 1), 'ts', tostring(now))
+    redis.call('PEXPIRE', KEYS[i], math.ceil((capacity - tokens[i] + 1) / rate * 1000) + 1000)
+end
+return {0, '0'}
+"""
+
+class RateLimit(NamedTuple):
+    rate_per_minute: float
+    burst: int
+
+class Bucket(NamedTuple):
+    key: str
+    rate: float  # tokens per second
+    capacity: int
+
+class MemoryTokenBuckets:
+    """Token buckets held in this process.
+
+    A bucket left alone long enough to refill completely is the same as a
+    fresh one, so entries expire after their refill time and the LRU bound
+    only matters under a flood of distinct keys.
+    """
+
+    def __init__(self, maxsize: int = 100000, timer=time.monotonic):
+        self._timer = timer
+        self._buckets = TTLCache(maxsize=maxsize, ttl=60, timer=timer)
+
+    async def take(self, buckets: Sequence[Bucket]) -> Tuple[int, float]:
+        """Take one token from every bucket, or from none if any is empty.
+
+        Returns (-1, 0) when allowed, else the index of the bucket with the
+        longest wait and the seconds until it has a token.
+        """
+        now = self._timer()
+        tokens = []
+        blocked, longest = -1, 0.0
+        for index, (key, rate, capacity) in enumerate(buckets):
+            available, updated_at = self._buckets.get(key, (capacity, now))
+            available = min(capacity, available + (now - updated_at) * rate)
+            tokens.append(available)
+            if available < 1 and (1 - available) / rate > longest:
+                blocked, longest = index, (1 - available) / rate
+        if blocked >= 0:
+            return blocked, longest
+        for (key, rate, capacity), available in zip(buckets, tokens):
+            self._buckets.set(key, (available - 1, now), ttl=(capacity - available + 1) / rate)
+        return -1, 0.0
+
+class RedisTokenBuckets:
+    """Token buckets shared by every API node through Redis"""
+
+    def __init__(self, client: "redis.Redis"):
+        self.client = client
+        self._take = client.register_script(TAKE_SCRIPT)
+
+    async def take(self, buckets: Sequence[Bucket]) -> Tuple[int, float]:
+        args = []
+        for _, rate, capacity in buckets:
+            args.extend([rate, capacity])
+        blocked, wait = await self._take(keys=[key for key, _, _ in buckets], args=args)
+        return int(blocked) - 1, float(wait)
+
+class SessionRateLimiter:
+    """Throttles session creation per user and per client IP.
+
+    Both buckets must have a token, and a token is taken from each only
+    when both do. Backend errors let the request through:
+    the limiter protects the database, it must not take logins down with it.
+    """
+
+    def __init__(self, backend, user_limit: RateLimit, ip_limit: RateLimit):
+        self.backend = backend
+        self.limits = {"user": user_limit, "ip": ip_limit}
+        self.throttled = Counter()
+
+    async def check(self, user_key: Optional[str], ip: str) -> float:
+        """Return 0 to allow the request, else the seconds until it may retry"""
+        scopes = []
+        buckets = []
+        for scope, key in (("user", user_key), ("ip", ip)):
+            if not key:
+                continue
+            limit = self.limits[scope]
+            scopes.append(scope)
+            buckets.append(Bucket(f"ratelimit:session_create:{scope}:{key}", limit.rate_per_minute / 60, limit.burst))
+        if not buckets:
+            return 0.0
+        try:
+            # All or nothing, so a request blocked by one bucket drains no other
+            blocked, wait = await self.backend.take(buckets)
+        except Exception as e:
+            logger.warning("Rate limiter unavailable, allowing request", extra={"error": str(e)})
+            return 0.0
+        if blocked >= 0:
+            self.throttled[scopes[blocked]] += 1
+            return wait
+        return 0.0
+
+_session_rate_limiter: Optional[SessionRateLimiter] = None
+
+def get_session_rate_limiter() -> SessionRateLimiter:
+    """Shared limiter using the configured backend"""
+    global _session_rate_limiter
+    if _session_rate_limiter is None:
+        if settings.rate_limit_backend == "redis":
+            import redis.asyncio as redis
+            backend = RedisTokenBuckets(redis.Redis.from_url(settings.redis_url, decode_responses=True))
+        else:
+            backend = MemoryTokenBuckets()
+            metrics.register_cache("rate_limit_buckets", backend._buckets)
+        _session_rate_limiter = SessionRateLimiter(
+            backend,
+            user_limit=RateLimit(settings.session_create_user_rate_per_minute, settings.session_create_user_burst),
+            ip_limit=RateLimit(settings.session_create_ip_rate_per_minute, settings.session_create_ip_burst),
+        )
+    return _session_rate_limiter
+
+def _throttled():
+    limiter = _session_rate_limiter
+    for scope in ("user", "ip"):
+        yield {"scope": scope}, limiter.throttled[scope] if limiter else 0
+
+metrics.register_collector(
+    "session_create_throttled_total", "counter", "Session create requests rejected by the rate limiter", _throttled
+)
@@ -0,0 +1,138 @@
+from datetime import datetime, timedelta
+from typing import Optional
+import argparse
+import asyncio
+import logging
+from sqlalchemy import and_, delete, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import settings
+from app.database import AsyncSessionLocal, dispose_engines
+from app.logging_config import configure_logging, shutdown_logging
+from app.models.session import ArchivedSession, UserSession
+from app.services.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Columns copied into the archive; session_token stays behind
+ARCHIVE_COLUMNS = ["id", "user_id", "device_profile_id", "device_fingerprint", "ip_address", "created_at", "last_activity"]
+
+class SessionArchiver:
+    """Move inactive sessions past the retention age into user_sessions_archive.
+
+    Each chunk is copied and deleted in one short transaction, so a run can
+    stop anywhere and the next run carries on with whatever is still in
+    user_sessions. Run one archiver at a time.
+    """
+
+    def __init__(
+        self,
+        session_factory=AsyncSessionLocal,
+        retention_days: Optional[int] = None,
+        chunk_size: Optional[int] = None,
+        pause_ms: Optional[int] = None
+    ):
+        self.session_factory = session_factory
+        self.retention_days = retention_days or settings.session_retention_days
+        self.chunk_size = chunk_size or settings.session_archive_chunk_size
+        self.pause_ms = settings.session_archive_pause_ms if pause_ms is None else pause_ms
+        self.total_archived = 0
+        self.last_run_archived = 0
+
+    def cutoff(self) -> datetime:
+        return datetime.utcnow() - timedelta(days=self.retention_days)
+
+    @staticmethod
+    def _eligible(cutoff: datetime):
+        return and_(UserSession.is_active == False, UserSession.last_activity < cutoff)
+
+    async def count_eligible(self, db: AsyncSession, cutoff: datetime) -> int:
+        result = await db.execute(select(func.count()).select_from(UserSession).where(self._eligible(cutoff)))
+        return result.scalar_one()
+
+    async def archive_chunk(self, db: AsyncSession, cutoff: datetime) -> Optional[int]:
+        """Archive one chunk; returns rows moved, or None when nothing is left"""
+        result = await db.execute(
+            select(UserSession.id)
+            .where(self._eligible(cutoff))
+            .order_by(UserSession.last_activity)
+            .limit(self.chunk_size)
+        )
+        chunk_ids = result.scalars().all()
+        if not chunk_ids:
+            return None
+
+        # Re-check eligibility in the same transaction as the copy and delete
+        in_chunk = and_(UserSession.id.in_(chunk_ids), self._eligible(cutoff))
+        await db.execute(
+            insert(ArchivedSession).from_select(
+                ARCHIVE_COLUMNS,
+                select(*(getattr(UserSession, column) for column in ARCHIVE_COLUMNS)).where(in_chunk)
+            )
+        )
+        result = await db.execute(delete(UserSession).where(in_chunk).execution_options(synchronize_session=False))
+        await db.commit()
+        return result.rowcount
+
+    async def run(self, max_chunks: Optional[int] = None) -> int:
+        """Archive until nothing is eligible or ``max_chunks`` chunks are done"""
+        cutoff = self.cutoff()
+        async with self.session_factory() as db:
+            eligible = await self.count_eligible(db, cutoff)
+        logger.info("Session archive started", extra={"eligible": eligible, "cutoff": cutoff.isoformat()})
+
+        archived = chunks = 0
+        while max_chunks is None or chunks < max_chunks:
+            async with self.session_factory() as db:
+                moved = await self.archive_chunk(db, cutoff)
+            if moved is None:
+                break
+            archived += moved
+            chunks += 1
+            self.total_archived += moved
+            logger.info("Session archive progress", extra={
+                "archived": archived,
+                "eligible": eligible,
+                "percent": round(100 * archived / eligible, 1) if eligible else 100.0,
+            })
+            if self.pause_ms:
+                # Let request-path writes in between chunks
+                await asyncio.sleep(self.pause_ms / 1000)
+
+        self.last_run_archived = archived
+        logger.info("Session archive finished", extra={
+            "archived": archived,
+            "chunks": chunks,
+            "complete": max_chunks is None or chunks < max_chunks,
+        })
+        return archived
+
+session_archiver = SessionArchiver()
+
+metrics.register_collector(
+    "session_archive_moved_total", "counter", "Sessions moved to the archive table",
+    lambda: [({}, session_archiver.total_archived)]
+)
+
+async def _main(args) -> None:
+    archiver = SessionArchiver(retention_days=args.retention_days, chunk_size=args.chunk_size)
+    try:
+        if args.dry_run:
+            async with archiver.session_factory() as db:
+                eligible = await archiver.count_eligible(db, archiver.cutoff())
+            logger.info("Session archive dry run", extra={"eligible": eligible})
+        else:
+            await archiver.run(max_chunks=args.max_chunks)
+    finally:
+        await dispose_engines()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Archive inactive sessions past the retention age")
+    parser.add_argument("--retention-days", type=int, help="defaults to SESSION_RETENTION_DAYS")
+    parser.add_argument("--chunk-size", type=int, help="defaults to SESSION_ARCHIVE_CHUNK_SIZE")
+    parser.add_argument("--max-chunks", type=int, help="stop after this many chunks; the next run resumes")
+    parser.add_argument("--dry-run", action="store_true", help="only report how many sessions are eligible")
+    configure_logging()
+    try:
+        asyncio.run(_main(parser.parse_args()))
+    finally:
+        shutdown_logging()
@@ -1,19 +1,29 @@
 from typing import List, Optional, Dict
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, select
 from app.models.user import User
 from app.models.session import UserSession
+from app.services.activity_buffer import activity_buffer
 from app.schemas.session import DeviceInfo
 from app.config import settings
+from app.services.device_profiles import device_profiles
+from app.services.session_events import session_events
+from app.services.session_tokens import session_tokens
+from app.services.session_views import active_session_listing
+from app.services.session_writes import deactivate_session, insert_session_within_limit
+from app.services.sweeper import expire_idle_sessions
 import uuid
 from datetime import datetime, timedelta
+import logging
+
+logger = logging.getLogger(__name__)
 
 class SessionService:
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
         self.max_devices = getattr(settings, 'max_devices_per_user', 3)
     
-    def create_session(
+    async def create_session(
         self, 
         user: User, 
         device_info: DeviceInfo, 
@@ -23,111 +33,95 @@ class SessionService:
         """Create new session for user"""
         from app.services.device import device_service
         
+        # Read before any rollback expires the instance
+        user_id = user.id
+        
         # Generate unique device fingerprint for each session
         device_fingerprint = device_service.generate_device_fingerprint(device_info)
         
-        # Get ALL active sessions (each browser tab is separate)
-        active_sessions = self.get_active_sessions(user.id)
+        # Create new session
+        session_id = str(uuid.uuid4())
+        session_token = str(uuid.uuid4())
+        values = {
+            "id": session_id,
+            "user_id": user_id,
+            "session_token": session_token,
+            "device_profile_id": await device_profiles.resolve(device_info.dict()),
+            "device_fingerprint": device_fingerprint,
+            "ip_address": ip_address,
+            "is_active": True
+        }
         
-        # Check device limit - CRITICAL: This enforces MAX 3 sessions
-        if len(active_sessions) >= self.max_devices:
-            if not force_session_id:
-                print(f"Device limit exceeded: {len(active_sessions)} >= {self.max_devices}")
+        # Limit check, optional forced termination and insert share one
+        # transaction - CRITICAL: This enforces MAX 3 sessions
+        terminated = []
+        try:
+            created = await insert_session_within_limit(self.db, values, self.max_devices)
+            if not created and force_session_id:
+                # Terminate the forced session
+                logger.info("Force terminating session", extra={"user_id": user_id, "session_id": force_session_id})
+                if await deactivate_session(self.db, user_id, force_session_id):
+                    terminated.append(force_session_id)
+                    created = await insert_session_within_limit(self.db, values, self.max_devices)
+            if not created:
+                await self.db.rollback()
+                active_sessions = await active_session_listing(self.db, user_id)
+                logger.info("Device limit exceeded", extra={"user_id": user_id, "active": len(active_sessions), "max_devices": self.max_devices})
                 return {
                     "status": "device_limit_exceeded",
                     "current_sessions": [self._session_to_dict(s) for s in active_sessions],
                     "max_devices": self.max_devices
                 }
-            else:
-                # Terminate the forced session
-                print(f"Force terminating session: {force_session_id}")
-                self.terminate_session(user.id, force_session_id)
-        
-        # Create new session
-        session_token = str(uuid.uuid4())
-        session = UserSession(
-            user_id=user.id,
-            session_token=session_token,
-            device_info=device_info.dict(),
-            device_fingerprint=device_fingerprint,
-            ip_address=ip_address,
-            is_active=True
-        )
-        
-        self.db.add(session)
-        self.db.commit()
-        self.db.refresh(session)
+            await self.db.commit()
+        except Exception:
+            await self.db.rollback()
+            raise
+        if terminated:
+            session_events.publish_terminated(terminated, reason="forced")
         
         return {
             "status": "success",
-            "session_id": session.id,
-            "session_token": session_token
+            "session_id": session_id,
+            "session_token": session_tokens.issue(session_id, user_id)
         }
     
-    def get_active_sessions(self, user_id: int) -> List[UserSession]:
+    async def get_active_sessions(self, user_id: int) -> List[UserSession]:
         """Get all active sessions for user"""
-        return self.db.query(UserSession).filter(
-            and_(
-                UserSession.user_id == user_id,
-                UserSession.is_active == True
+        result = await self.db.execute(
+            select(UserSession).where(
+                and_(
+                    UserSession.user_id == user_id,
+                    UserSession.is_active == True
+                )
             )
-        ).all()
+        )
+        return result.scalars().all()
     
-    def terminate_session(self, user_id: int, session_id: str) -> bool:
+    async def terminate_session(self, user_id: int, session_id: str) -> bool:
         """Terminate specific session"""
-        session = self.db.query(UserSession).filter(
-            and_(
-                UserSession.id == session_id,
-                UserSession.user_id == user_id,
-                UserSession.is_active == True
-            )
-        ).first()
-        
-        if session:
-            session.is_active = False
-            self.db.commit()
+        if await deactivate_session(self.db, user_id, session_id):
+            await self.db.commit()
+            session_events.publish_terminated([session_id], reason="terminated")
             return True
         return False
     
-    def update_session_activity(self, session_id: str) -> bool:
-        """Update session last activity"""
-        session = self.db.query(UserSession).filter(
-            and_(
-                UserSession.id == session_id,
-                UserSession.is_active == True
-            )
-        ).first()
-        
-        if session:
-            session.last_activity = datetime.utcnow()
-            self.db.commit()
-            return True
-        return False
+    def update_session_activity(self, user_id: int, session_id: str) -> None:
+        """Buffer a heartbeat; it is written with the next bulk flush"""
+        activity_buffer.record(user_id, session_id)
     
-    def cleanup_expired_sessions(self):
-        """Remove expired sessions"""
+    async def cleanup_expired_sessions(self) -> int:
+        """Expire sessions idle longer than the session timeout"""
         expiry_time = datetime.utcnow() - timedelta(minutes=getattr(settings, 'session_timeout_minutes', 30))
-        
-        expired_sessions = self.db.query(UserSession).filter(
-            and_(
-                UserSession.last_activity < expiry_time,
-                UserSession.is_active == True
-            )
-        ).all()
-        
-        for session in expired_sessions:
-            session.is_active = False
-        
-        self.db.commit()
-        return len(expired_sessions)
+        return await expire_idle_sessions(self.db, expiry_time, settings.session_sweep_chunk_size)
     
-    def _session_to_dict(self, session: UserSession) -> Dict:
-        """Convert session to dictionary"""
+    def _session_to_dict(self, session) -> Dict:
+        """Convert an active_session_listing row to dictionary"""
         return {
             "session_id": session.id,
-            "device_info": session.device_info,
+            # The profile leaves the IP out; DeviceInfo carries it
+            "device_info": {**session.device_info, "ip_address": session.ip_address},
             "ip_address": session.ip_address,
-            "created_at": session.created_at.isoformat(),
-            "last_activity": session.last_activity.isoformat(),
+            "created_at": session.created_at,
+            "last_activity": session.last_activity,
             "is_current": False
         }
\ No newline at end of file
@@ -0,0 +1,65 @@
+from collections import defaultdict
+from typing import Iterable, List
+import logging
+from sqlalchemy import and_, select
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import use_primary
+from app.models.session import DeviceProfile, UserSession
+from app.schemas.admin import SessionFilter
+from app.services.session_events import session_events
+from app.services.session_store import get_session_store
+from app.services.session_writes import deactivate_matching
+
+logger = logging.getLogger(__name__)
+
+class SessionAdminService:
+    """Bulk terminations, each one set-based UPDATE in its own transaction"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.store = get_session_store()
+
+    async def terminate_for_user(self, user_id: int) -> List[Row]:
+        return await self._terminate(UserSession.user_id == user_id, reason="admin")
+
+    async def terminate_for_users(self, user_ids: Iterable[int]) -> List[Row]:
+        return await self._terminate(UserSession.user_id.in_(list(user_ids)), reason="admin")
+
+    async def terminate_matching(self, session_filter: SessionFilter) -> List[Row]:
+        conditions = []
+        if session_filter.ip_address is not None:
+            conditions.append(UserSession.ip_address == session_filter.ip_address)
+        profile_conditions = [
+            getattr(DeviceProfile, key) == getattr(session_filter, key)
+            for key in ("browser", "os", "device_type")
+            if getattr(session_filter, key) is not None
+        ]
+        if profile_conditions:
+            # Resolved against the small profiles table; sessions match on the integer id
+            conditions.append(UserSession.device_profile_id.in_(
+                select(DeviceProfile.id).where(and_(*profile_conditions))
+            ))
+        if not conditions:
+            raise ValueError("at least one filter is required")
+        return await self._terminate(and_(*conditions), reason="admin")
+
+    async def _terminate(self, condition, reason: str) -> List[Row]:
+        """Deactivate every active session matching condition and return (id, user_id) rows"""
+        use_primary(self.db)
+        try:
+            rows = await deactivate_matching(self.db, condition)
+            await self.db.commit()
+        except Exception:
+            await self.db.rollback()
+            raise
+
+        session_events.publish_terminated([row.id for row in rows], reason=reason)
+        if self.store is not None:
+            by_user = defaultdict(list)
+            for row in rows:
+                by_user[row.user_id].append(row.id)
+            for user_id, session_ids in by_user.items():
+                await self.store.remove(user_id, session_ids)
+        logger.info("Bulk session termination", extra={"terminated": len(rows), "reason": reason})
+        return rows
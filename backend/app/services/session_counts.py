@@ -0,0 +1,75 @@
+from typing import Optional
+import argparse
+import asyncio
+import logging
+from sqlalchemy import select
+from app.config import settings
+from app.database import AsyncSessionLocal, dispose_engines, use_primary
+from app.logging_config import configure_logging, shutdown_logging
+from app.models.user import User
+from app.services.metrics import metrics
+from app.services.session_writes import recount_slots
+
+logger = logging.getLogger(__name__)
+
+class SessionCountReconciler:
+    """Repair drift in users.active_session_count from the user_sessions rows.
+
+    Walks users in primary-key order, one short transaction per chunk. Each
+    chunk locks its user rows first, so a login committing meanwhile is
+    either fully counted or waits for the repair.
+    """
+
+    def __init__(self, session_factory=AsyncSessionLocal, chunk_size: Optional[int] = None):
+        self.session_factory = session_factory
+        self.chunk_size = chunk_size or settings.active_session_count_reconcile_chunk_size
+        self.total_repaired = 0
+
+    async def run(self) -> int:
+        """Reconcile every user; returns how many counters were repaired"""
+        repaired = checked = 0
+        last_id = 0
+        while True:
+            async with self.session_factory() as db:
+                use_primary(db)
+                result = await db.execute(
+                    select(User.id)
+                    .where(User.id > last_id)
+                    .order_by(User.id)
+                    .limit(self.chunk_size)
+                    .with_for_update()
+                )
+                user_ids = result.scalars().all()
+                if not user_ids:
+                    break
+                fixed = await recount_slots(db, user_ids)
+                await db.commit()
+            last_id = user_ids[-1]
+            checked += len(user_ids)
+            repaired += fixed
+            self.total_repaired += fixed
+            logger.info("Session count reconcile progress", extra={"checked": checked, "repaired": repaired})
+        logger.info("Session count reconcile finished", extra={"checked": checked, "repaired": repaired})
+        return repaired
+
+session_count_reconciler = SessionCountReconciler()
+
+metrics.register_collector(
+    "active_session_count_repaired_total", "counter", "Per-user active session counters corrected by reconciliation",
+    lambda: [({}, session_count_reconciler.total_repaired)]
+)
+
+async def _main(args) -> None:
+    try:
+        await SessionCountReconciler(chunk_size=args.chunk_size).run()
+    finally:
+        await dispose_engines()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Repair users.active_session_count from user_sessions")
+    parser.add_argument("--chunk-size", type=int, help="defaults to ACTIVE_SESSION_COUNT_RECONCILE_CHUNK_SIZE")
+    configure_logging()
+    try:
+        asyncio.run(_main(parser.parse_args()))
+    finally:
+        shutdown_logging()
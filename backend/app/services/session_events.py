@@ -0,0 +1,58 @@
+from collections import defaultdict
+from typing import Callable, Dict, Iterable, List, Set
+import asyncio
+from app.services.metrics import metrics
+
+class SessionEventBroker:
+    """In-process pub/sub of session lifecycle events, keyed by session id.
+
+    Each open event stream subscribes with its own queue. Publishing never
+    blocks and never touches the database; subscribers on other API nodes
+    are not reached, so clients keep a slow validate poll as a fallback.
+    """
+
+    def __init__(self):
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = defaultdict(set)
+        self._listeners: List[Callable[[Dict], None]] = []
+
+    def subscribe(self, session_id: str) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue()
+        self._subscribers[session_id].add(queue)
+        return queue
+
+    def unsubscribe(self, session_id: str, queue: asyncio.Queue) -> None:
+        queues = self._subscribers.get(session_id)
+        if queues is None:
+            return
+        queues.discard(queue)
+        if not queues:
+            del self._subscribers[session_id]
+
+    def add_listener(self, listener: Callable[[Dict], None]) -> None:
+        """Call ``listener`` synchronously with every published event"""
+        self._listeners.append(listener)
+
+    def publish(self, session_id: str, event: Dict) -> None:
+        for listener in self._listeners:
+            listener(event)
+        for queue in self._subscribers.get(session_id, ()):
+            queue.put_nowait(event)
+
+    def publish_terminated(self, session_ids: Iterable[str], reason: str) -> None:
+        """Tell every stream of the given sessions that they are gone"""
+        for session_id in session_ids:
+            self.publish(session_id, {
+                "type": "terminated",
+                "session_id": session_id,
+                "reason": reason
+            })
+
+    def subscriber_count(self) -> int:
+        return sum(len(queues) for queues in self._subscribers.values())
+
+session_events = SessionEventBroker()
+
+metrics.register_collector(
+    "session_event_subscribers", "gauge", "Open session event streams",
+    lambda: [({}, session_events.subscriber_count())]
+)
@@ -0,0 +1,154 @@
+from datetime import datetime
+from typing import AsyncIterator, Optional
+import csv
+import io
+import json
+from sqlalchemy import and_, false, select, union_all
+from sqlalchemy.engine import Row
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models.session import ArchivedSession, DeviceProfile, UserSession
+
+# Rows fetched from the cursor at a time, and rows per chunk sent to the client
+YIELD_PER = 500
+CHUNK_ROWS = 500
+
+def _export_columns(table, is_active):
+    """Export columns of a session table; session_token never leaves the database"""
+    return (
+        table.id,
+        table.user_id,
+        DeviceProfile.attributes.label("device_info"),
+        DeviceProfile.browser,
+        DeviceProfile.os,
+        DeviceProfile.device_type,
+        table.ip_address,
+        is_active.label("is_active"),
+        table.created_at,
+        table.last_activity,
+    )
+
+CSV_HEADER = ["session_id", "user_id", "browser", "os", "device_type", "ip_address", "is_active", "created_at", "last_activity"]
+
+class SessionExporter:
+    """Stream session history with keyset pagination over the primary key.
+
+    History covers user_sessions and the sessions the retention job moved to
+    user_sessions_archive. Each page is one UNION ALL of both tables in its
+    own short transaction, streamed with ``yield_per`` (a server-side cursor
+    where the driver has one), so neither memory nor a pooled connection is
+    tied to the size of the export, and a session archived mid-export is
+    still read exactly once.
+    """
+
+    def __init__(
+        self,
+        user_id: Optional[int] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        session_factory=AsyncSessionLocal,
+        page_size: Optional[int] = None
+    ):
+        self.session_factory = session_factory
+        self.page_size = page_size or settings.export_page_size
+        self.user_id = user_id
+        self.since = since
+        self.until = until
+
+    def _table_page(self, table, is_active, last_id: Optional[str]):
+        """The next page of one session table, ordered by id"""
+        conditions = []
+        if self.user_id is not None:
+            conditions.append(table.user_id == self.user_id)
+        if self.since is not None:
+            conditions.append(table.created_at >= self.since)
+        if self.until is not None:
+            conditions.append(table.created_at < self.until)
+        if last_id is not None:
+            conditions.append(table.id > last_id)
+        statement = (
+            select(*_export_columns(table, is_active))
+            .join(DeviceProfile, table.device_profile_id == DeviceProfile.id)
+            .order_by(table.id)
+            .limit(self.page_size)
+        )
+        if conditions:
+            statement = statement.where(and_(*conditions))
+        return select(statement.subquery())
+
+    def _page(self, last_id: Optional[str]):
+        # Archived sessions are inactive by definition
+        page = union_all(
+            self._table_page(UserSession, UserSession.is_active, last_id),
+            self._table_page(ArchivedSession, false(), last_id),
+        ).subquery()
+        return (
+            select(page)
+            .order_by(page.c.id)
+            .limit(self.page_size)
+            .execution_options(yield_per=YIELD_PER)
+        )
+
+    async def rows(self) -> AsyncIterator[Row]:
+        last_id = None
+        while True:
+            fetched = 0
+            async with self.session_factory() as db:
+                result = await db.stream(self._page(last_id))
+                async for row in result:
+                    fetched += 1
+                    last_id = row.id
+                    yield row
+            if fetched < self.page_size:
+                return
+
+    async def ndjson(self) -> AsyncIterator[str]:
+        lines = []
+        async for row in self.rows():
+            lines.append(self._ndjson_line(row))
+            if len(lines) >= CHUNK_ROWS:
+                yield "".join(lines)
+                lines = []
+        if lines:
+            yield "".join(lines)
+
+    async def csv(self) -> AsyncIterator[str]:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(CSV_HEADER)
+        pending = 0
+        async for row in self.rows():
+            writer.writerow(self._csv_fields(row))
+            pending += 1
+            if pending >= CHUNK_ROWS:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+                pending = 0
+        yield buffer.getvalue()
+
+    @staticmethod
+    def _ndjson_line(row: Row) -> str:
+        return json.dumps({
+            "session_id": row.id,
+            "user_id": row.user_id,
+            "device_info": row.device_info,
+            "ip_address": row.ip_address,
+            "is_active": row.is_active,
+            "created_at": row.created_at.isoformat() if row.created_at else None,
+            "last_activity": row.last_activity.isoformat() if row.last_activity else None,
+        }) + "\n"
+
+    @staticmethod
+    def _csv_fields(row: Row) -> list:
+        return [
+            row.id,
+            row.user_id,
+            row.browser or "",
+            row.os or "",
+            row.device_type or "",
+            row.ip_address,
+            row.is_active,
+            row.created_at.isoformat() if row.created_at else "",
+            row.last_activity.isoformat() if row.last_activity else "",
+        ]
@@ -0,0 +1,122 @@
+from typing import TYPE_CHECKING, Dict, Iterable, Optional
+from app.config import settings
+
+if TYPE_CHECKING:
+    import redis.asyncio as redis
+
+# Every hydrated user hash carries this field so that "no active sessions"
+# (hash holding only the marker) can be told apart from "not loaded yet"
+# (key missing). Redis deletes a hash once its last field is removed.
+LOADED_MARKER = "~loaded"
+
+# KEYS[1] = user hash, ARGV = limit, session id, browser, ttl, force
+# Returns -1 when the hash has to be hydrated from SQL first, 0 when the
+# limit is reached and 1 when the slot was reserved.
+RESERVE_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return -1
+end
+local active = redis.call('HLEN', KEYS[1]) - 1
+if active >= tonumber(ARGV[1]) and ARGV[5] ~= '1' then
+    return 0
+end
+redis.call('HSET', KEYS[1], ARGV[2], ARGV[3])
+redis.call('EXPIRE', KEYS[1], tonumber(ARGV[4]))
+return 1
+"""
+
+# KEYS[1] = user hash, ARGV = ttl, then alternating session id / browser
+HYDRATE_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    return 0
+end
+redis.call('HSET', KEYS[1], '~loaded', '1')
+for i = 2, #ARGV, 2 do
+    redis.call('HSET', KEYS[1], ARGV[i], ARGV[i + 1])
+end
+redis.call('EXPIRE', KEYS[1], tonumber(ARGV[1]))
+return 1
+"""
+
+
+def _to_str(value) -> str:
+    return value.decode() if isinstance(value, bytes) else value
+
+
+class ActiveSessionStore:
+    """Per-user set of active session ids kept in Redis.
+
+    SQL stays the durable record; this store is written through on every
+    create/terminate so device-limit checks and validation can be answered
+    without loading session rows. A user's hash is hydrated from SQL on first
+    use and expires after ``ttl_seconds`` of inactivity, so any drift heals
+    itself on the next hydration.
+    """
+
+    def __init__(self, client: "redis.Redis", ttl_seconds: int = 24 * 60 * 60):
+        self.client = client
+        self.ttl_seconds = ttl_seconds
+        self._reserve = client.register_script(RESERVE_SCRIPT)
+        self._hydrate = client.register_script(HYDRATE_SCRIPT)
+
+    @staticmethod
+    def _key(user_id: int) -> str:
+        return f"sessions:active:{user_id}"
+
+    async def hydrate(self, user_id: int, sessions: Dict[str, str]) -> None:
+        """Load a user's active sessions (id -> browser) unless already present"""
+        args = [self.ttl_seconds]
+        for session_id, browser in sessions.items():
+            args.extend([session_id, browser])
+        await self._hydrate(keys=[self._key(user_id)], args=args)
+
+    async def reserve(
+        self,
+        user_id: int,
+        session_id: str,
+        browser: str,
+        limit: int,
+        force: bool = False
+    ) -> Optional[bool]:
+        """Atomically check the device limit and add the session.
+
+        Returns None when the user has not been hydrated yet.
+        """
+        result = await self._reserve(
+            keys=[self._key(user_id)],
+            args=[limit, session_id, browser, self.ttl_seconds, "1" if force else "0"]
+        )
+        if result == -1:
+            return None
+        return result == 1
+
+    async def remove(self, user_id: int, session_ids: Iterable[str]) -> None:
+        session_ids = list(session_ids)
+        if session_ids:
+            await self.client.hdel(self._key(user_id), *session_ids)
+
+    async def get_sessions(self, user_id: int) -> Optional[Dict[str, str]]:
+        """Return active session id -> browser, or None if not hydrated"""
+        raw = await self.client.hgetall(self._key(user_id))
+        if not raw:
+            return None
+        sessions = {_to_str(key): _to_str(value) for key, value in raw.items()}
+        sessions.pop(LOADED_MARKER, None)
+        return sessions
+
+
+_session_store: Optional[ActiveSessionStore] = None
+
+
+def get_session_store() -> Optional[ActiveSessionStore]:
+    """Shared store instance, or None when the Redis store is disabled"""
+    global _session_store
+    if not settings.redis_session_store_enabled:
+        return None
+    if _session_store is None:
+        # Imported here so deployments without Redis never load the client
+        import redis.asyncio as redis
+        _session_store = ActiveSessionStore(
+            redis.Redis.from_url(settings.redis_url, decode_responses=True)
+        )
+    return _session_store
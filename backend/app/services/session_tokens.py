@@ -0,0 +1,82 @@
+from base64 import urlsafe_b64encode
+from typing import Dict, NamedTuple, Optional
+import hashlib
+import hmac
+import time
+from app.config import settings
+from app.services.cache import TTLCache
+from app.services.metrics import metrics
+from app.services.session_events import session_events
+
+class SessionClaims(NamedTuple):
+    session_id: str
+    user_id: int
+    expires_at: int
+
+class SessionTokenSigner:
+    """Stateless session tokens: ``<session_id>.<user_id>.<expires_at>.<hmac>``.
+
+    The HMAC-SHA256 over the first three fields is keyed with
+    ``settings.secret_key``, so a token can be checked without the database.
+    Whether the session was since terminated is a separate question
+    answered by ``SessionStatusCache``.
+    """
+
+    def __init__(self, secret_key: Optional[str] = None, ttl: Optional[int] = None):
+        self._key = (secret_key or settings.secret_key).encode()
+        self.ttl = ttl or settings.session_token_ttl_seconds
+
+    def _sign(self, message: str) -> str:
+        digest = hmac.new(self._key, message.encode(), hashlib.sha256).digest()
+        return urlsafe_b64encode(digest).rstrip(b"=").decode()
+
+    def issue(self, session_id: str, user_id: int) -> str:
+        message = f"{session_id}.{user_id}.{int(time.time()) + self.ttl}"
+        return f"{message}.{self._sign(message)}"
+
+    def verify(self, token: str) -> Optional[SessionClaims]:
+        """Return the claims of an authentic, unexpired token, else None"""
+        message, _, signature = token.rpartition(".")
+        # Bytes, since compare_digest rejects str with non-ASCII characters
+        if not hmac.compare_digest(signature.encode(), self._sign(message).encode()):
+            return None
+        try:
+            session_id, user_id, expires_at = message.split(".")
+            claims = SessionClaims(session_id, int(user_id), int(expires_at))
+        except ValueError:
+            return None
+        if claims.expires_at <= time.time():
+            return None
+        return claims
+
+    def needs_refresh(self, claims: SessionClaims) -> bool:
+        """True once less than half of the token lifetime is left"""
+        return claims.expires_at - time.time() < self.ttl / 2
+
+class SessionStatusCache:
+    """Recently confirmed session states, so validation rarely hits the DB.
+
+    Active sessions are remembered for a short TTL, which bounds how long a
+    termination on another node can go unnoticed. Terminations on this node
+    arrive through ``session_events`` and take effect immediately.
+    """
+
+    def __init__(self, active_ttl: Optional[int] = None, maxsize: int = 100000):
+        self.active_ttl = active_ttl or settings.session_status_cache_seconds
+        self._states = TTLCache(maxsize=maxsize, ttl=self.active_ttl)
+
+    def get(self, session_id: str) -> Optional[bool]:
+        return self._states.get(session_id)
+
+    def record(self, session_id: str, active: bool) -> None:
+        # Terminated sessions never come back, so keep those longer
+        self._states.set(session_id, active, ttl=None if active else settings.session_token_ttl_seconds)
+
+    def on_event(self, event: Dict) -> None:
+        if event["type"] == "terminated":
+            self.record(event["session_id"], False)
+
+session_tokens = SessionTokenSigner()
+session_status = SessionStatusCache()
+session_events.add_listener(session_status.on_event)
+metrics.register_cache("session_status", session_status._states)
@@ -0,0 +1,88 @@
+from datetime import datetime
+from typing import Dict, List, NamedTuple, Optional
+from sqlalchemy import and_, select
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.session import DeviceProfile, UserSession
+
+# Read models: Core selects of only the columns a caller needs, returned as
+# tuples. No identity map, no change tracking and, where only the display
+# fields of a device are needed, no decoding of its JSON document.
+
+WITH_PROFILE = UserSession.__table__.join(DeviceProfile, UserSession.device_profile_id == DeviceProfile.id)
+
+def _active(user_id: int):
+    return and_(UserSession.user_id == user_id, UserSession.is_active == True)
+
+class SessionSummary(NamedTuple):
+    session_id: str
+    browser: Optional[str]
+    os: Optional[str]
+    device_type: Optional[str]
+    ip_address: str
+    created_at: Optional[datetime]
+    last_activity: Optional[datetime]
+
+    def to_dict(self) -> Dict:
+        """Display form used in the device-limit response"""
+        return {
+            "session_id": self.session_id,
+            "device_info": {
+                "browser": self.browser or "Unknown Browser",
+                "operating_system": self.os or "Unknown OS",
+                "device_type": self.device_type or "Desktop"
+            },
+            "ip_address": self.ip_address,
+            "created_at": self.created_at or datetime.utcnow(),
+            "last_activity": self.last_activity or datetime.utcnow()
+        }
+
+SUMMARY_COLUMNS = (
+    UserSession.id,
+    DeviceProfile.browser,
+    DeviceProfile.os,
+    DeviceProfile.device_type,
+    UserSession.ip_address,
+    UserSession.created_at,
+    UserSession.last_activity,
+)
+
+# Session listing keeps the whole device document
+LISTING_COLUMNS = (
+    UserSession.id,
+    DeviceProfile.attributes.label("device_info"),
+    UserSession.ip_address,
+    UserSession.created_at,
+    UserSession.last_activity,
+)
+
+# Statement builders, shared with benchmarks.query_plans so the plan check
+# runs exactly what the services run
+
+def summaries_statement(user_id: int):
+    return select(*SUMMARY_COLUMNS).select_from(WITH_PROFILE).where(_active(user_id))
+
+def listing_statement(user_id: int):
+    return select(*LISTING_COLUMNS).select_from(WITH_PROFILE).where(_active(user_id))
+
+def browsers_statement(user_id: int):
+    return select(UserSession.id, DeviceProfile.browser).select_from(WITH_PROFILE).where(_active(user_id))
+
+def session_active_statement(user_id: int, session_id: str):
+    """Primary-key lookup of one of the user's active sessions"""
+    return select(UserSession.id).where(and_(UserSession.id == session_id, _active(user_id)))
+
+async def active_session_summaries(db: AsyncSession, user_id: int) -> List[SessionSummary]:
+    """The user's active sessions with the display fields of their device profile"""
+    result = await db.execute(summaries_statement(user_id))
+    return [SessionSummary._make(row) for row in result]
+
+async def active_session_listing(db: AsyncSession, user_id: int) -> List[Row]:
+    """(id, device_info, ip_address, created_at, last_activity) of active sessions"""
+    result = await db.execute(listing_statement(user_id))
+    return result.all()
+
+async def active_session_browsers(db: AsyncSession, user_id: int) -> Dict[str, str]:
+    """Active session id -> browser"""
+    result = await db.execute(browsers_statement(user_id))
+    return {session_id: browser or "" for session_id, browser in result}
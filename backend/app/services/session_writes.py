@@ -0,0 +1,134 @@
+from collections import Counter
+from typing import Dict, Iterable, List
+from sqlalchemy import and_, bindparam, case, func, insert, select, update
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.session import UserSession
+from app.models.user import User
+
+# Write helpers shared by the session services. None of them commit, so a
+# caller can terminate, check the limit and insert inside one transaction.
+# users.active_session_count is kept in step with every change here.
+
+users_table = User.__table__
+
+# Executed with one parameter set per user; never drops below zero, so a
+# drifted counter cannot wedge a user out of logging in
+RELEASE_SLOTS = (
+    update(users_table)
+    .where(users_table.c.id == bindparam("b_user_id"))
+    .values(active_session_count=case(
+        (users_table.c.active_session_count > bindparam("b_released"),
+         users_table.c.active_session_count - bindparam("b_released")),
+        else_=0
+    ))
+)
+
+def reserve_slot_statement(user_id: int, max_devices: int):
+    return (
+        update(users_table)
+        .where(
+            and_(
+                users_table.c.id == user_id,
+                users_table.c.active_session_count < max_devices
+            )
+        )
+        .values(active_session_count=users_table.c.active_session_count + 1)
+    )
+
+async def reserve_slot(db: AsyncSession, user_id: int, max_devices: int) -> bool:
+    """Take one of the user's device slots, if any is free.
+
+    A single conditional UPDATE by primary key: it both checks the limit
+    and row-locks the user, so concurrent logins queue behind each other.
+    """
+    result = await db.execute(reserve_slot_statement(user_id, max_devices))
+    return result.rowcount == 1
+
+async def release_slots(db: AsyncSession, user_ids: Iterable[int]) -> None:
+    """Give back one slot per occurrence of a user id"""
+    released = Counter(user_ids)
+    if released:
+        await db.execute(RELEASE_SLOTS, [
+            {"b_user_id": user_id, "b_released": count} for user_id, count in released.items()
+        ])
+
+async def recount_slots(db: AsyncSession, user_ids: Iterable[int]) -> int:
+    """Reset the users' counters from their active rows; returns how many were off"""
+    active = (
+        select(func.count())
+        .select_from(UserSession)
+        .where(
+            and_(
+                UserSession.user_id == users_table.c.id,
+                UserSession.is_active == True
+            )
+        )
+        .scalar_subquery()
+    )
+    result = await db.execute(
+        update(users_table)
+        .where(
+            and_(
+                users_table.c.id.in_(list(user_ids)),
+                users_table.c.active_session_count != active
+            )
+        )
+        .values(active_session_count=active)
+    )
+    return result.rowcount
+
+def deactivate_session_statement(user_id: int, session_id: str):
+    return (
+        update(UserSession)
+        .where(
+            and_(
+                UserSession.id == session_id,
+                UserSession.user_id == user_id,
+                UserSession.is_active == True
+            )
+        )
+        .values(is_active=False)
+        .execution_options(synchronize_session=False)
+    )
+
+async def deactivate_session(db: AsyncSession, user_id: int, session_id: str) -> bool:
+    """Mark one of the user's active sessions inactive"""
+    result = await db.execute(deactivate_session_statement(user_id, session_id))
+    if result.rowcount != 1:
+        return False
+    await release_slots(db, [user_id])
+    return True
+
+async def insert_session_within_limit(db: AsyncSession, values: Dict, max_devices: int) -> bool:
+    """INSERT the session only if the user has a free device slot"""
+    if not await reserve_slot(db, values["user_id"], max_devices):
+        return False
+    await db.execute(insert(UserSession).values(**values))
+    return True
+
+async def deactivate_matching(db: AsyncSession, condition) -> List[Row]:
+    """Deactivate every active session matching condition; returns (id, user_id) rows"""
+    predicate = and_(UserSession.is_active == True, condition)
+    statement = (
+        update(UserSession)
+        .where(predicate)
+        .values(is_active=False)
+        .execution_options(synchronize_session=False)
+    )
+    if db.bind.dialect.full_returning:
+        result = await db.execute(statement.returning(UserSession.id, UserSession.user_id))
+        rows = result.all()
+        await release_slots(db, [row.user_id for row in rows])
+        return rows
+    
+    # No UPDATE .. RETURNING for this dialect under SQLAlchemy 1.4 (SQLite):
+    # read the ids first. A writer committing in between can make the list
+    # slightly wrong, so the counters are recounted instead of decremented,
+    # while this transaction holds the write lock.
+    result = await db.execute(select(UserSession.id, UserSession.user_id).where(predicate))
+    rows = result.all()
+    if rows:
+        await db.execute(statement)
+        await recount_slots(db, {row.user_id for row in rows})
+    return rows
@@ -1,174 +1,205 @@
-from typing import List, Dict
-from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from typing import List, Dict, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, select
+from sqlalchemy.orm import joinedload
+from app.database import reads_from_replica, use_primary
 from app.models.user import User
 from app.models.session import UserSession
+from app.services.device_profiles import device_profiles
+from app.services.session_events import session_events
+from app.services.session_store import ActiveSessionStore, get_session_store
+from app.services.session_tokens import session_tokens
+from app.services.session_views import active_session_browsers, active_session_summaries, session_active_statement
+from app.services.session_writes import deactivate_session, insert_session_within_limit
+from app.services.user_agent import classify_user_agent
 import uuid
 from datetime import datetime
+import logging
 import time
 
+logger = logging.getLogger(__name__)
+
 class SimpleSessionService:
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession, store: Optional[ActiveSessionStore] = None):
         self.db = db
         self.max_devices = 3  # Fixed to 3 devices
+        self.store = store if store is not None else get_session_store()
     
-    def create_session(self, user: User, device_info: str, ip_address: str, force_create: bool = False) -> Dict:
-        """Create new session and check device limit"""
-        
-        # Clean up expired sessions first
-        self._cleanup_expired_sessions(user.id)
-        
-        # Get ONLY active sessions
-        active_sessions = self.get_active_sessions(user.id)
-        
-        print(f"User {user.id} has {len(active_sessions)} active sessions (force_create: {force_create})")
-        
-        # Check device limit - only if we actually have 3 or more sessions AND not force creating
-        if len(active_sessions) >= self.max_devices and not force_create:
-            print(f"Device limit exceeded for user {user.id}")
-            return {
-                "status": "device_limit_exceeded",
-                "current_sessions": [self._session_to_dict(s) for s in active_sessions],
-                "max_devices": self.max_devices
-            }
+    async def create_session(
+        self,
+        user: User,
+        device_info: str,
+        ip_address: str,
+        force_session_id: Optional[str] = None
+    ) -> Dict:
+        """Create new session and check device limit.
+        
+        With force_session_id the given session is terminated in the same
+        transaction, so either both changes land or neither does.
+        """
+        
+        # Read before any rollback expires the instance
+        user_id = user.id
         
         # Parse browser info from user agent
         browser_info = self._parse_browser_info(device_info)
+        device_profile_id = await device_profiles.resolve({
+            "browser": browser_info["browser"],
+            "os": browser_info["os"],
+            "device_type": browser_info["device_type"]
+        })
+        session_id = str(uuid.uuid4())
+        force = force_session_id is not None
+        
+        if self.store is not None:
+            # Cross-node pre-check and slot reservation in one Redis script;
+            # the conditional insert below stays authoritative
+            if not await self._reserve_slot(user_id, session_id, browser_info["browser"], force):
+                return await self._limit_exceeded(user_id)
+        
+        # Naive UTC, the clock the sweeper and the activity buffer compare against
+        current_time = datetime.utcnow()
+        
+        values = {
+            "id": session_id,
+            "user_id": user_id,
+            "session_token": str(uuid.uuid4()),
+            "device_profile_id": device_profile_id,
+            "device_fingerprint": f"{browser_info['browser']}_{browser_info['os']}_{time.time()}",
+            "ip_address": ip_address,
+            "is_active": True,
+            "created_at": current_time,
+            "last_activity": current_time
+        }
         
-        # Create new session with local timezone
-        from datetime import timezone, timedelta
-        
-        # Assuming IST (UTC+5:30) - adjust as needed
-        local_tz = timezone(timedelta(hours=5, minutes=30))
-        current_time = datetime.now(local_tz)
-        
-        session = UserSession(
-            user_id=user.id,
-            session_token=str(uuid.uuid4()),
-            device_info={
-                "browser": browser_info["browser"],
-                "os": browser_info["os"],
-                "device_type": browser_info["device_type"]
-            },
-            device_fingerprint=f"{browser_info['browser']}_{browser_info['os']}_{time.time()}",
-            ip_address=ip_address,
-            is_active=True,
-            created_at=current_time.replace(tzinfo=None),
-            last_activity=current_time.replace(tzinfo=None)
-        )
-        
-        self.db.add(session)
-        self.db.commit()
-        self.db.refresh(session)
-        
-        print(f"Created new session {session.id} for user {user.id}")
+        try:
+            if force and not await deactivate_session(self.db, user_id, force_session_id):
+                await self._abort(user_id, session_id)
+                return {"status": "session_not_found"}
+            
+            if not await insert_session_within_limit(self.db, values, self.max_devices):
+                await self._abort(user_id, session_id)
+                return await self._limit_exceeded(user_id)
+            
+            await self.db.commit()
+        except Exception:
+            await self._abort(user_id, session_id)
+            raise
+        
+        if force:
+            logger.info("Session force-terminated", extra={"user_id": user_id, "session_id": force_session_id})
+            if self.store is not None:
+                await self.store.remove(user_id, [force_session_id])
+            session_events.publish_terminated([force_session_id], reason="forced")
+        logger.info("Session created", extra={"user_id": user_id, "session_id": session_id})
         
         return {
             "status": "success",
-            "session_id": session.id
+            "session_id": session_id,
+            "session_token": session_tokens.issue(session_id, user_id)
         }
     
-    def get_active_sessions(self, user_id: int) -> List[UserSession]:
-        """Get all active sessions for user"""
-        sessions = self.db.query(UserSession).filter(
-            and_(
-                UserSession.user_id == user_id,
-                UserSession.is_active == True
+    async def get_active_sessions(self, user_id: int) -> List[UserSession]:
+        """Get all active sessions for user, with their device profiles"""
+        result = await self.db.execute(
+            select(UserSession)
+            .options(joinedload(UserSession.device_profile))
+            .where(
+                and_(
+                    UserSession.user_id == user_id,
+                    UserSession.is_active == True
+                )
             )
-        ).all()
+        )
+        sessions = result.scalars().all()
         
-        print(f"Found {len(sessions)} active sessions for user {user_id}")
+        logger.debug("Active sessions loaded", extra={"user_id": user_id, "count": len(sessions)})
         return sessions
     
-    def terminate_session(self, user_id: int, session_id: str) -> bool:
+    async def get_active_session_browsers(self, user_id: int) -> Dict[str, str]:
+        """Get active session id -> browser, from Redis when enabled"""
+        if self.store is not None:
+            sessions = await self.store.get_sessions(user_id)
+            if sessions is not None:
+                return sessions
+            # Hydrating from a lagging replica would drop recent sessions
+            use_primary(self.db)
+            sessions = await self._load_session_browsers(user_id)
+            await self.store.hydrate(user_id, sessions)
+            return sessions
+        return await self._load_session_browsers(user_id)
+    
+    async def is_session_active(self, user_id: int, session_id: str) -> bool:
+        """Primary-key check that a session belongs to the user and is active.
+        
+        A miss on a replica is confirmed on the primary, since a session
+        created moments ago may not have replicated yet.
+        """
+        statement = session_active_statement(user_id, session_id)
+        result = await self.db.execute(statement)
+        if result.first() is not None:
+            return True
+        if not reads_from_replica(self.db):
+            return False
+        use_primary(self.db)
+        result = await self.db.execute(statement)
+        return result.first() is not None
+    
+    async def terminate_session(self, user_id: int, session_id: str) -> bool:
         """Terminate specific session"""
-        session = self.db.query(UserSession).filter(
-            and_(
-                UserSession.id == session_id,
-                UserSession.user_id == user_id,
-                UserSession.is_active == True
-            )
-        ).first()
-        
-        if session:
-            session.is_active = False
-            self.db.commit()
-            print(f"Terminated session {session_id}")
+        use_primary(self.db)
+        if await deactivate_session(self.db, user_id, session_id):
+            await self.db.commit()
+            if self.store is not None:
+                await self.store.remove(user_id, [session_id])
+            session_events.publish_terminated([session_id], reason="terminated")
+            logger.info("Session terminated", extra={"user_id": user_id, "session_id": session_id})
             return True
         return False
     
-    def _cleanup_expired_sessions(self, user_id: int):
-        """Remove sessions older than 24 hours"""
-        from datetime import timedelta
-        
-        expiry_time = datetime.utcnow() - timedelta(hours=24)
-        
-        expired_sessions = self.db.query(UserSession).filter(
-            and_(
-                UserSession.user_id == user_id,
-                UserSession.is_active == True,
-                UserSession.last_activity < expiry_time
-            )
-        ).all()
-        
-        for session in expired_sessions:
-            session.is_active = False
-        
-        if expired_sessions:
-            self.db.commit()
-            print(f"Cleaned up {len(expired_sessions)} expired sessions")
+    async def _abort(self, user_id: int, session_id: str):
+        """Roll back a failed create and release its Redis reservation"""
+        await self.db.rollback()
+        if self.store is not None:
+            await self.store.remove(user_id, [session_id])
+    
+    async def _limit_exceeded(self, user_id: int) -> Dict:
+        logger.info("Device limit exceeded", extra={"user_id": user_id, "max_devices": self.max_devices})
+        return {
+            "status": "device_limit_exceeded",
+            "current_sessions": [s.to_dict() for s in await active_session_summaries(self.db, user_id)],
+            "max_devices": self.max_devices
+        }
+    
+    async def _reserve_slot(self, user_id: int, session_id: str, browser: str, force: bool) -> bool:
+        """Reserve a device slot in Redis, hydrating the user from SQL on a miss"""
+        reserved = await self.store.reserve(user_id, session_id, browser, self.max_devices, force)
+        if reserved is None:
+            # Hydrating from a lagging replica would drop recent sessions
+            use_primary(self.db)
+            await self.store.hydrate(user_id, await self._load_session_browsers(user_id))
+            reserved = await self.store.reserve(user_id, session_id, browser, self.max_devices, force)
+        return bool(reserved)
+    
+    async def _load_session_browsers(self, user_id: int) -> Dict[str, str]:
+        """Read active session id -> browser from SQL"""
+        return await active_session_browsers(self.db, user_id)
     
     def _parse_browser_info(self, user_agent: str) -> Dict:
         """Parse browser info from user agent"""
-        ua_lower = user_agent.lower()
-        
-        # Determine browser
-        if "chrome" in ua_lower and "edg" not in ua_lower:
-            browser = "Chrome"
-        elif "firefox" in ua_lower:
-            browser = "Firefox"
-        elif "safari" in ua_lower and "chrome" not in ua_lower:
-            browser = "Safari"
-        elif "edg" in ua_lower:
-            browser = "Edge"
-        else:
-            browser = "Unknown Browser"
-        
-        # Determine OS
-        if "windows" in ua_lower:
-            os = "Windows"
-        elif "mac" in ua_lower and "iphone" not in ua_lower:
-            os = "macOS"
-        elif "linux" in ua_lower:
-            os = "Linux"
-        elif "android" in ua_lower:
-            os = "Android"
-        elif "iphone" in ua_lower or "ios" in ua_lower:
-            os = "iOS"
-        else:
-            os = "Unknown OS"
-        
-        # Determine device type
-        if any(mobile in ua_lower for mobile in ["mobile", "android", "iphone"]):
-            device_type = "Mobile"
-        elif any(tablet in ua_lower for tablet in ["tablet", "ipad"]):
-            device_type = "Tablet"
-        else:
-            device_type = "Desktop"
-        
+        ua = classify_user_agent(user_agent)
         return {
-            "browser": browser,
-            "os": os,
-            "device_type": device_type
+            "browser": "Unknown Browser" if ua.browser == "Unknown" else ua.browser,
+            "os": "Unknown OS" if ua.os == "Unknown" else ua.os,
+            "device_type": ua.device_type.capitalize()
         }
     
     def _session_to_dict(self, session: UserSession) -> Dict:
-        """Convert session to dictionary with clean display info"""
-        device_info = session.device_info
+        """Convert session to dictionary with clean display info.
         
-        # Format timestamps in local timezone
-        from datetime import timezone, timedelta
-        local_tz = timezone(timedelta(hours=5, minutes=30))  # IST
+        Timestamps stay datetimes; the response class serializes them.
+        """
+        profile = session.device_profile
         
         created_time = session.created_at if session.created_at else datetime.utcnow()
         activity_time = session.last_activity if session.last_activity else datetime.utcnow()
@@ -176,11 +207,11 @@ class SimpleSessionService:
         return {
             "session_id": session.id,
             "device_info": {
-                "browser": device_info.get("browser", "Unknown Browser"),
-                "operating_system": device_info.get("os", "Unknown OS"),
-                "device_type": device_info.get("device_type", "Desktop")
+                "browser": profile.browser or "Unknown Browser",
+                "operating_system": profile.os or "Unknown OS",
+                "device_type": profile.device_type or "Desktop"
             },
             "ip_address": session.ip_address,
-            "created_at": created_time.isoformat(),
-            "last_activity": activity_time.isoformat()
+            "created_at": created_time,
+            "last_activity": activity_time
         }
\ No newline at end of file
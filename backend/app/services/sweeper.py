@@ -0,0 +1,123 @@
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Optional
+import asyncio
+import logging
+from sqlalchemy import and_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import settings
+from app.database import AsyncSessionLocal, dispose_engines
+from app.logging_config import configure_logging, shutdown_logging
+from app.models.session import UserSession
+from app.services.activity_buffer import activity_buffer
+from app.services.metrics import metrics
+from app.services.session_events import session_events
+from app.services.session_store import get_session_store
+from app.services.session_writes import deactivate_matching
+
+logger = logging.getLogger(__name__)
+
+def idle_sessions_statement(cutoff: datetime, chunk_size: int):
+    return select(UserSession.id, UserSession.user_id).where(
+        and_(
+            UserSession.is_active == True,
+            UserSession.last_activity < cutoff
+        )
+    ).limit(chunk_size)
+
+async def expire_idle_sessions(db: AsyncSession, cutoff: datetime, chunk_size: int) -> int:
+    """Deactivate sessions idle since before cutoff, one bounded UPDATE per chunk"""
+    store = get_session_store()
+    swept = 0
+    while True:
+        result = await db.execute(idle_sessions_statement(cutoff, chunk_size))
+        rows = result.all()
+        if not rows:
+            break
+
+        # Re-checks the cutoff, so sessions whose activity landed after the
+        # SELECT stay active; releases the users' device slots
+        expired = await deactivate_matching(
+            db,
+            and_(
+                UserSession.id.in_([row.id for row in rows]),
+                UserSession.last_activity < cutoff
+            )
+        )
+        await db.commit()
+        swept += len(expired)
+
+        session_events.publish_terminated([row.id for row in expired], reason="expired")
+        if store is not None:
+            by_user = defaultdict(list)
+            for row in expired:
+                by_user[row.user_id].append(row.id)
+            for user_id, session_ids in by_user.items():
+                await store.remove(user_id, session_ids)
+
+        if len(rows) < chunk_size:
+            break
+    return swept
+
+class SessionSweeper:
+    """Background job that expires sessions idle longer than the session timeout"""
+
+    def __init__(
+        self,
+        session_factory=AsyncSessionLocal,
+        timeout_minutes: Optional[int] = None,
+        interval_seconds: Optional[int] = None,
+        chunk_size: Optional[int] = None
+    ):
+        self.session_factory = session_factory
+        self.timeout_minutes = timeout_minutes or settings.session_timeout_minutes
+        self.interval_seconds = interval_seconds or settings.session_sweep_interval_seconds
+        self.chunk_size = chunk_size or settings.session_sweep_chunk_size
+        self.last_swept = 0
+        self.total_swept = 0
+
+    async def sweep_once(self) -> int:
+        """Run one sweep and return how many sessions it expired"""
+        # Buffered heartbeats must land first or live sessions look idle
+        await activity_buffer.flush()
+        cutoff = datetime.utcnow() - timedelta(minutes=self.timeout_minutes)
+        async with self.session_factory() as db:
+            swept = await expire_idle_sessions(db, cutoff, self.chunk_size)
+        self.last_swept = swept
+        self.total_swept += swept
+        logger.info("Session sweep finished", extra={"swept": swept, "cutoff": cutoff.isoformat()})
+        return swept
+
+    async def run(self) -> None:
+        """Sweep every interval until cancelled"""
+        while True:
+            try:
+                await self.sweep_once()
+            except Exception as e:
+                logger.error(f"Session sweep failed: {e}")
+            await asyncio.sleep(self.interval_seconds)
+
+session_sweeper = SessionSweeper()
+
+metrics.register_collector(
+    "session_sweeper_expired_total", "counter", "Sessions expired by the sweeper",
+    lambda: [({}, session_sweeper.total_swept)]
+)
+metrics.register_collector(
+    "session_sweeper_last_expired", "gauge", "Sessions expired by the most recent sweep",
+    lambda: [({}, session_sweeper.last_swept)]
+)
+
+async def _run_worker() -> None:
+    try:
+        await session_sweeper.run()
+    finally:
+        await dispose_engines()
+
+if __name__ == "__main__":
+    # Run the sweeper as its own worker instead of inside the API process
+    configure_logging()
+    try:
+        asyncio.run(_run_worker())
+    finally:
+        shutdown_logging()
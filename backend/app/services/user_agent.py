@@ -0,0 +1,64 @@
+from functools import lru_cache
+from typing import NamedTuple
+import re
+from app.services.metrics import metrics
+
+# Every keyword the rules below look at, found in one scan of the lowercased
+# UA. These keywords never overlap each other in real user agents, so the
+# non-overlapping matches give the same set as per-keyword substring checks
+# (benchmarks/user_agents.py checks this against a corpus).
+_KEYWORDS = re.compile(
+    r"chrome|edg|firefox|safari|windows|mac|linux|android|i(?:phone|os|pad)|mobile|tablet"
+)
+
+class UserAgentInfo(NamedTuple):
+    browser: str      # Chrome, Firefox, Safari, Edge or Unknown
+    os: str           # Windows, macOS, Linux, Android, iOS or Unknown
+    device_type: str  # mobile, tablet or desktop
+
+@lru_cache(maxsize=1024)
+def classify_user_agent(user_agent: str) -> UserAgentInfo:
+    """Classify browser, OS and device type from a raw user-agent string"""
+    found = set(_KEYWORDS.findall(user_agent.lower()))
+
+    if "chrome" in found and "edg" not in found:
+        browser = "Chrome"
+    elif "firefox" in found:
+        browser = "Firefox"
+    elif "safari" in found and "chrome" not in found:
+        browser = "Safari"
+    elif "edg" in found:
+        browser = "Edge"
+    else:
+        browser = "Unknown"
+
+    if "windows" in found:
+        os = "Windows"
+    elif "mac" in found and "iphone" not in found:
+        os = "macOS"
+    elif "linux" in found:
+        os = "Linux"
+    elif "android" in found:
+        os = "Android"
+    elif "iphone" in found or "ios" in found:
+        os = "iOS"
+    else:
+        os = "Unknown"
+
+    if found & {"mobile", "android", "iphone"}:
+        device_type = "mobile"
+    elif found & {"tablet", "ipad"}:
+        device_type = "tablet"
+    else:
+        device_type = "desktop"
+
+    return UserAgentInfo(browser, os, device_type)
+
+metrics.register_collector(
+    "user_agent_cache_hits_total", "counter", "User-agent classifier cache hits",
+    lambda: [({}, classify_user_agent.cache_info().hits)]
+)
+metrics.register_collector(
+    "user_agent_cache_misses_total", "counter", "User-agent classifier cache misses",
+    lambda: [({}, classify_user_agent.cache_info().misses)]
+)
@@ -0,0 +1,83 @@
+from contextlib import AsyncExitStack
+from sqlalchemy import select, text
+from sqlalchemy.pool import QueuePool
+import asyncio
+import logging
+import time
+from app.config import settings
+from app.database import AsyncSessionLocal, async_engine, replica_engines
+from app.models.user import User
+from app.services.session_views import active_session_browsers, active_session_summaries
+from app.services.simple_session import SimpleSessionService
+from app.services.user_agent import classify_user_agent
+
+logger = logging.getLogger(__name__)
+
+# The agents behind most traffic; classifying them fills the LRU cache
+COMMON_USER_AGENTS = [
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.4.1 Safari/605.1.15",
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:125.0) Gecko/20100101 Firefox/125.0",
+    "Mozilla/5.0 (iPhone; CPU iPhone OS 17_4_1 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.4.1 Mobile/15E148 Safari/604.1",
+    "Mozilla/5.0 (Linux; Android 14; Pixel 8 Pro) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.6367.82 Mobile Safari/537.36",
+]
+
+def preload() -> None:
+    """Import the dependencies this deployment will use and prime CPU-only caches.
+
+    Opens no sockets and starts no threads, so it is safe in a gunicorn
+    ``--preload`` master: workers forked afterwards share the loaded modules.
+    """
+    if settings.auth0_domain or settings.auth0_jwks_url:
+        import jwt  # noqa: F401
+        import requests  # noqa: F401
+    if settings.redis_session_store_enabled:
+        import redis.asyncio  # noqa: F401
+    for user_agent in COMMON_USER_AGENTS:
+        classify_user_agent(user_agent)
+
+async def warm_db_pool(connections: int = 0) -> int:
+    """Open pool connections on every engine and compile the hot-path statements"""
+    opened = 0
+    try:
+        for pool_engine in (async_engine, *replica_engines):
+            count = connections or (pool_engine.pool.size() if isinstance(pool_engine.pool, QueuePool) else 1)
+            # Hold every connection at once so the pool really grows to that size
+            async with AsyncExitStack() as stack:
+                for _ in range(count):
+                    connection = await stack.enter_async_context(pool_engine.connect())
+                    await connection.execute(text("SELECT 1"))
+            opened += count
+        # Fill SQLAlchemy's compiled statement cache with the per-request queries
+        async with AsyncSessionLocal() as db:
+            await db.execute(select(User).where(User.auth0_user_id == ""))
+            await active_session_summaries(db, 0)
+            await active_session_browsers(db, 0)
+            await SimpleSessionService(db).is_session_active(0, "")
+    except Exception as e:
+        # Not fatal: requests open connections and compile statements on demand
+        logger.warning("Database warmup failed", extra={"error": str(e)})
+    return opened
+
+async def warm_jwks() -> bool:
+    """Fetch the signing keys now instead of on the first authenticated request"""
+    if not (settings.auth0_domain or settings.auth0_jwks_url):
+        return False
+    from app.services.auth import get_auth_validator
+    try:
+        await asyncio.to_thread(get_auth_validator().refresh_signing_keys)
+    except Exception as e:
+        # Not fatal: the first request retries the fetch
+        logger.warning("JWKS warmup failed", extra={"error": str(e)})
+        return False
+    return True
+
+async def warm_up() -> None:
+    """Per-worker warmup run from the lifespan, after any fork"""
+    start = time.perf_counter()
+    connections, jwks = await asyncio.gather(warm_db_pool(settings.warmup_db_connections), warm_jwks())
+    logger.info("Warmup finished", extra={
+        "db_connections": connections,
+        "jwks_loaded": jwks,
+        "duration_ms": round((time.perf_counter() - start) * 1000, 1),
+    })
@@ -0,0 +1,276 @@
+"""HTTP load benchmark for the session endpoints.
+
+Boots ``app.main:app`` under uvicorn in a subprocess against a fresh SQLite
+database, then drives create, force-create, validate and users/me with a
+pool of simulated users at a fixed concurrency. Reports p50/p95/p99 latency
+and requests per second per endpoint; results can be saved as a JSON
+baseline and later runs compared against it.
+
+    cd backend
+    python -m benchmarks.http_load --users 200 --concurrency 32 --requests 2000
+    python -m benchmarks.http_load --save baseline.json
+    python -m benchmarks.http_load --compare baseline.json
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import deque
+from datetime import datetime
+
+import httpx
+from sqlalchemy import create_engine
+
+from app.database import Base
+from app.models.session import UserSession  # noqa: F401 - registers the user_sessions table
+from app.models.user import User  # noqa: F401 - registers the users table
+
+USER_AGENTS = [
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 14.4; rv:125.0) Gecko/20100101 Firefox/125.0",
+    "Mozilla/5.0 (iPhone; CPU iPhone OS 17_4_1 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.4.1 Mobile/15E148 Safari/604.1",
+]
+
+SCENARIOS = ["create", "force_create", "validate", "users_me"]
+
+
+class VirtualUser:
+    """One simulated account with the session ids it currently holds"""
+
+    def __init__(self, index: int):
+        self.headers = {
+            "x-user-id": f"auth0|bench-{index}",
+            "x-user-email": f"bench{index}@example.com",
+            "x-user-name": f"Bench {index}",
+            "user-agent": USER_AGENTS[index % len(USER_AGENTS)],
+        }
+        self.sessions: deque = deque()
+        self.token = None
+        # Requests for one account are serialised so force-create always
+        # targets a session that still exists
+        self.lock = asyncio.Lock()
+
+
+async def create(client: httpx.AsyncClient, user: VirtualUser) -> httpx.Response:
+    response = await client.post("/api/sessions/create", headers=user.headers)
+    body = response.json()
+    if body.get("status") == "success":
+        user.sessions.append(body["session_id"])
+        user.token = body["session_token"]
+    return response
+
+
+async def force_create(client: httpx.AsyncClient, user: VirtualUser) -> httpx.Response:
+    if not user.sessions:
+        return await create(client, user)
+    response = await client.post(
+        "/api/sessions/force-create",
+        headers=user.headers,
+        json={"session_id": user.sessions.popleft()},
+    )
+    if response.status_code == 200:
+        body = response.json()
+        user.sessions.append(body["session_id"])
+        user.token = body["session_token"]
+    return response
+
+
+async def validate(client: httpx.AsyncClient, user: VirtualUser) -> httpx.Response:
+    headers = user.headers if user.token is None else {**user.headers, "x-session-token": user.token}
+    return await client.get("/api/session/validate", headers=headers)
+
+
+async def users_me(client: httpx.AsyncClient, user: VirtualUser) -> httpx.Response:
+    return await client.get("/api/users/me", headers=user.headers)
+
+
+ACTIONS = {
+    "create": create,
+    "force_create": force_create,
+    "validate": validate,
+    "users_me": users_me,
+}
+
+
+def percentile(sorted_values, pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+async def run_scenario(client, users, name: str, requests: int, concurrency: int) -> dict:
+    action = ACTIONS[name]
+    latencies = []
+    errors = 0
+    counter = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for i in counter:
+            user = users[i % len(users)]
+            async with user.lock:
+                start = time.perf_counter()
+                try:
+                    response = await action(client, user)
+                    failed = response.status_code >= 400
+                except httpx.HTTPError:
+                    failed = True
+                latencies.append((time.perf_counter() - start) * 1000)
+            errors += failed
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "requests": requests,
+        "errors": errors,
+        "rps": round(requests / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+    }
+
+
+async def drive(base_url: str, args) -> dict:
+    users = [VirtualUser(i) for i in range(args.users)]
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        # Warm up: every account exists and holds at least one session
+        await run_scenario(client, users, "create", len(users), args.concurrency)
+        return {
+            name: await run_scenario(client, users, name, args.requests, args.concurrency)
+            for name in args.scenarios
+        }
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(db_path: str, port: int, **extra_env: str) -> subprocess.Popen:
+    env = dict(
+        os.environ,
+        DATABASE_URL=f"sqlite:///{db_path}",
+        SESSION_SWEEPER_ENABLED="false",
+        REDIS_SESSION_STORE_ENABLED="false",
+        # Every simulated user shares one IP and creates far faster than
+        # any real client
+        RATE_LIMIT_ENABLED="false",
+        **extra_env,
+    )
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app",
+         "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning", "--no-access-log"],
+        env=env,
+        stdout=subprocess.DEVNULL,
+    )
+
+
+def wait_until_healthy(base_url: str, server: subprocess.Popen, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"server exited with code {server.returncode}")
+        try:
+            if httpx.get(f"{base_url}/health", timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError("server did not become healthy in time")
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> int:
+    """Print deltas against a baseline and return how many metrics regressed"""
+    regressions = 0
+    for name, current in results.items():
+        previous = baseline.get("results", {}).get(name)
+        if previous is None:
+            continue
+        for metric, higher_is_worse in (("p95_ms", True), ("p99_ms", True), ("rps", False)):
+            old, new = previous[metric], current[metric]
+            if not old:
+                continue
+            change = (new - old) / old * 100
+            regressed = change > threshold if higher_is_worse else change < -threshold
+            regressions += regressed
+            print(f"  {'REGRESSED' if regressed else 'ok':9} {name}.{metric}: {old} -> {new} ({change:+.1f}%)")
+    return regressions
+
+
+def create_database() -> str:
+    """Fresh SQLite database with the current schema; returns its path"""
+    db_path = os.path.join(tempfile.mkdtemp(), "http_load.db")
+    engine = create_engine(f"sqlite:///{db_path}")
+    Base.metadata.create_all(engine)
+    engine.dispose()
+    return db_path
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=100, help="simulated accounts")
+    parser.add_argument("--concurrency", type=int, default=16, help="requests in flight")
+    parser.add_argument("--requests", type=int, default=1000, help="requests per scenario")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument("--save", help="write the results to this JSON baseline")
+    parser.add_argument("--compare", help="compare against this JSON baseline")
+    parser.add_argument("--threshold", type=float, default=20.0,
+                        help="percent change in p95/p99/rps treated as a regression")
+    args = parser.parse_args()
+
+    db_path = create_database()
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    server = start_server(db_path, port)
+    try:
+        wait_until_healthy(base_url, server)
+        results = asyncio.run(drive(base_url, args))
+    finally:
+        server.terminate()
+        server.wait()
+
+    print(f"{'scenario':14} {'rps':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    for name, row in results.items():
+        print(f"{name:14} {row['rps']:>9} {row['p50_ms']:>9} {row['p95_ms']:>9} {row['p99_ms']:>9} {row['errors']:>7}")
+
+    report = {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "users": args.users,
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+        },
+        "results": results,
+    }
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Saved baseline to {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print(f"Compared with {args.compare} ({baseline['meta']['timestamp']}):")
+        if compare(results, baseline, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
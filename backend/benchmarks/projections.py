@@ -0,0 +1,149 @@
+"""Micro-benchmark for the session read models.
+
+Seeds a fresh SQLite database with users holding 3, 50 and 1000 active
+sessions, then compares loading them as ORM entities (the previous
+device-limit payload and validate paths) with the Core projections in
+app.services.session_views. Reports time per call and the memory
+allocated per call under tracemalloc, and checks both give the same result.
+
+    cd backend
+    python -m benchmarks.projections --repeat 50
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import and_, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models.session import DeviceProfile, UserSession
+from app.models.user import User
+from app.services.device_profiles import normalize_profile
+from app.services.session_views import WITH_PROFILE, active_session_browsers, active_session_summaries
+from app.services.simple_session import SimpleSessionService
+
+SESSIONS_PER_USER = [3, 50, 1000]
+
+DEVICE_INFO = {"browser": "Chrome", "os": "Windows", "device_type": "Desktop"}
+
+
+async def seed(session_factory) -> None:
+    start = datetime(2024, 5, 1, 9, 30)
+    async with session_factory() as db:
+        attributes, profile_hash = normalize_profile(DEVICE_INFO)
+        db.add(DeviceProfile(id=1, profile_hash=profile_hash, attributes=attributes, **DEVICE_INFO))
+        for user_id, count in enumerate(SESSIONS_PER_USER, start=1):
+            db.add(User(id=user_id, auth0_user_id=f"bench|{user_id}", email=f"{user_id}@example.com", full_name="Bench"))
+            await db.flush()
+            await db.execute(insert(UserSession), [
+                {
+                    "id": str(uuid.uuid4()),
+                    "user_id": user_id,
+                    "session_token": str(uuid.uuid4()),
+                    "device_profile_id": 1,
+                    "device_fingerprint": "bench",
+                    "ip_address": "203.0.113.7",
+                    "is_active": True,
+                    "created_at": start + timedelta(minutes=i),
+                    "last_activity": start + timedelta(minutes=i, seconds=42),
+                }
+                for i in range(count)
+            ])
+        await db.commit()
+
+
+async def orm_limit_payload(db: AsyncSession, user_id: int) -> list:
+    service = SimpleSessionService(db)
+    return [service._session_to_dict(s) for s in await service.get_active_sessions(user_id)]
+
+
+async def projected_limit_payload(db: AsyncSession, user_id: int) -> list:
+    return [s.to_dict() for s in await active_session_summaries(db, user_id)]
+
+
+async def decoded_browsers(db: AsyncSession, user_id: int) -> dict:
+    """Decode each session's device document in Python"""
+    result = await db.execute(
+        select(UserSession.id, DeviceProfile.attributes).select_from(WITH_PROFILE).where(
+            and_(UserSession.user_id == user_id, UserSession.is_active == True)
+        )
+    )
+    return {
+        session_id: device_info.get("browser", "") if isinstance(device_info, dict) else ""
+        for session_id, device_info in result.all()
+    }
+
+
+async def projected_browsers(db: AsyncSession, user_id: int) -> dict:
+    return await active_session_browsers(db, user_id)
+
+
+VARIANTS = {
+    "limit payload": [("ORM entities", orm_limit_payload), ("projection", projected_limit_payload)],
+    "validate browsers": [("decode JSON", decoded_browsers), ("profile column", projected_browsers)],
+}
+
+
+async def measure(session_factory, load, user_id: int, repeat: int):
+    # A fresh session per call, as per request
+    async def call():
+        async with session_factory() as db:
+            return await load(db, user_id)
+
+    await call()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        await call()
+    per_call_ms = (time.perf_counter() - start) / repeat * 1000
+
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    before, _ = tracemalloc.get_traced_memory()
+    await call()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return per_call_ms, (peak - before) / 1024
+
+
+async def run(repeat: int) -> None:
+    db_path = os.path.join(tempfile.mkdtemp(), "projections.db")
+    engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await seed(session_factory)
+
+    try:
+        for title, variants in VARIANTS.items():
+            print(title)
+            for user_id, count in enumerate(SESSIONS_PER_USER, start=1):
+                async with session_factory() as db:
+                    results = [await load(db, user_id) for _, load in variants]
+                assert all(result == results[0] for result in results), (title, count)
+
+                baseline = None
+                for name, load in variants:
+                    per_call_ms, peak_kib = await measure(session_factory, load, user_id, max(1, repeat * 50 // count))
+                    baseline = baseline or (per_call_ms, peak_kib)
+                    print(f"  {count:>5} sessions  {name:<14} {per_call_ms:8.3f} ms/call  {baseline[0] / per_call_ms:4.1f}x"
+                          f"  {peak_kib:9.1f} KiB peak  {baseline[1] / peak_kib:4.1f}x")
+    finally:
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=50, help="calls per variant for 50 sessions; scaled by size")
+    args = parser.parse_args()
+    asyncio.run(run(args.repeat))
+
+
+if __name__ == "__main__":
+    main()
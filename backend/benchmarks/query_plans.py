@@ -0,0 +1,179 @@
+"""Query-plan regression check for the active-session query shapes.
+
+Seeds a throwaway SQLite database with a large history of inactive sessions
+(plus a handful of active ones), then runs EXPLAIN QUERY PLAN and a timed
+execution for every hot statement the session services issue, built by the
+same functions. Exits non-zero if any of them stops using its expected index.
+
+    cd backend
+    python -m benchmarks.query_plans --rows 2000000
+"""
+import argparse
+import json
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine
+from sqlalchemy.dialects import sqlite
+
+from app.database import Base
+from app.models.session import UserSession  # noqa: F401 - registers the session tables
+from app.models.user import User  # noqa: F401 - registers the users table
+from app.services.device_profiles import normalize_profile
+from app.services.session_views import (
+    browsers_statement,
+    listing_statement,
+    session_active_statement,
+    summaries_statement,
+)
+from app.services.session_writes import deactivate_session_statement, reserve_slot_statement
+from app.services.sweeper import idle_sessions_statement
+
+USER_COUNT = 10_000
+HOT_USER_ID = 42
+HOT_SESSION_ID = "hot-session"
+# Distinct device profiles the sessions are spread over
+DEVICE_PROFILE_COUNT = 500
+
+
+def hot_queries(now: datetime):
+    """The statements the session services run, from the same builders.
+
+    Each maps to the plan fragments it must show: the index every table in
+    it is expected to be searched by.
+    """
+    cutoff = now - timedelta(minutes=30)
+    by_user_active = "SEARCH user_sessions USING INDEX ix_user_sessions_user_active_activity"
+    profile_by_pk = "SEARCH device_profiles USING INTEGER PRIMARY KEY"
+    session_by_pk = "SEARCH user_sessions USING INDEX sqlite_autoindex_user_sessions_1"
+    return {
+        # Device-limit payload, session listing and validate without a token
+        "active_session_summaries": (summaries_statement(HOT_USER_ID), [by_user_active, profile_by_pk]),
+        "active_session_listing": (listing_statement(HOT_USER_ID), [by_user_active, profile_by_pk]),
+        "active_session_browsers": (browsers_statement(HOT_USER_ID), [by_user_active, profile_by_pk]),
+        # Validate with a session token, on a status cache miss
+        "is_session_active": (session_active_statement(HOT_USER_ID, HOT_SESSION_ID), [session_by_pk]),
+        # Device limit check on create
+        "reserve_slot": (
+            reserve_slot_statement(HOT_USER_ID, 3),
+            ["SEARCH users USING INTEGER PRIMARY KEY"],
+        ),
+        # Terminate and force-create
+        "deactivate_session": (deactivate_session_statement(HOT_USER_ID, HOT_SESSION_ID), [session_by_pk]),
+        # Expiry sweep
+        "idle_sessions": (
+            idle_sessions_statement(cutoff, 500),
+            ["SEARCH user_sessions USING INDEX ix_user_sessions_active_activity"],
+        ),
+    }
+
+
+def seed(path: str, rows: int, now: datetime) -> None:
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    engine.dispose()
+
+    conn = sqlite3.connect(path)
+    seed_rows(conn, rows, now)
+    conn.close()
+
+
+def seed_rows(conn: sqlite3.Connection, rows: int, now: datetime) -> None:
+    """Fill an already created schema and ANALYZE it"""
+    conn.executemany(
+        "INSERT INTO users (id, auth0_user_id, email, full_name, is_active) VALUES (?, ?, ?, ?, 1)",
+        ((i, f"auth0|{i}", f"user{i}@example.com", f"User {i}") for i in range(1, USER_COUNT + 1)),
+    )
+
+    def profile_rows():
+        for profile_id in range(1, DEVICE_PROFILE_COUNT + 1):
+            device_info = {
+                "browser": f"Browser {profile_id}",
+                "os": ("Windows", "macOS", "Linux", "Android", "iOS")[profile_id % 5],
+                "device_type": ("Desktop", "Mobile", "Tablet")[profile_id % 3],
+            }
+            yield (
+                profile_id, normalize_profile(device_info)[1], device_info["browser"],
+                device_info["os"], device_info["device_type"], json.dumps(device_info),
+            )
+
+    conn.executemany(
+        "INSERT INTO device_profiles (id, profile_hash, browser, os, device_type, attributes) VALUES (?, ?, ?, ?, ?, ?)",
+        profile_rows(),
+    )
+
+    def session_rows():
+        for i in range(rows):
+            active = i % 50_000 == 0
+            last_activity = now - timedelta(minutes=random.randint(0, 60 * 24 * 365))
+            yield (
+                str(uuid.uuid4()), random.randint(1, USER_COUNT), str(uuid.uuid4()),
+                random.randint(1, DEVICE_PROFILE_COUNT), "", "127.0.0.1", active, last_activity, last_activity,
+            )
+        # The hot user always has a couple of live sessions
+        for session_id in (HOT_SESSION_ID, str(uuid.uuid4())):
+            yield (
+                session_id, HOT_USER_ID, str(uuid.uuid4()),
+                random.randint(1, DEVICE_PROFILE_COUNT), "", "127.0.0.1", True, now, now,
+            )
+
+    conn.executemany(
+        "INSERT INTO user_sessions (id, user_id, session_token, device_profile_id, device_fingerprint,"
+        " ip_address, is_active, created_at, last_activity) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        session_rows(),
+    )
+    conn.commit()
+    conn.execute("ANALYZE")
+
+
+def query_plan(conn: sqlite3.Connection, statement) -> str:
+    """EXPLAIN QUERY PLAN of a statement, one " | "-joined line"""
+    compiled = statement.compile(dialect=sqlite.dialect())
+    params = [compiled.params[key] for key in compiled.positiontup]
+    return " | ".join(row[-1] for row in conn.execute(f"EXPLAIN QUERY PLAN {compiled}", params))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=2_000_000, help="session rows to seed")
+    parser.add_argument("--db", help="reuse/keep this SQLite file instead of a temp file")
+    args = parser.parse_args()
+
+    now = datetime.utcnow()
+    path = args.db or os.path.join(tempfile.mkdtemp(), "query_plans.db")
+    if not os.path.exists(path):
+        start = time.perf_counter()
+        seed(path, args.rows, now)
+        print(f"Seeded {args.rows} sessions in {time.perf_counter() - start:.1f}s ({path})")
+
+    conn = sqlite3.connect(path)
+    dialect = sqlite.dialect()
+    failures = 0
+    for name, (statement, expected) in hot_queries(now).items():
+        plan = query_plan(conn, statement)
+        compiled = statement.compile(dialect=dialect)
+        params = [compiled.params[key] for key in compiled.positiontup]
+
+        # Writes are timed too, then rolled back so every run sees the seed
+        start = time.perf_counter()
+        cursor = conn.execute(str(compiled), params)
+        count = len(cursor.fetchall()) if cursor.description else cursor.rowcount
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        conn.rollback()
+
+        ok = all(fragment in plan for fragment in expected)
+        failures += not ok
+        print(f"[{'ok' if ok else 'FAIL'}] {name}: {count} rows in {elapsed_ms:.2f} ms")
+        print(f"       plan: {plan}")
+    conn.close()
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
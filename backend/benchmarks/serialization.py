@@ -0,0 +1,131 @@
+"""Micro-benchmark for session list serialization.
+
+Compares the previous path (a SessionResponse built per row, then
+jsonable_encoder and json.dumps, as FastAPI did for ``response_model``
+lists), the same with FastAPI's extra response_model re-validation, and
+the fast path (plain dicts rendered by orjson through ORJSONResponse).
+Also checks that all three produce the same JSON document.
+
+    cd backend
+    python -m benchmarks.serialization --repeat 200
+"""
+import argparse
+import json
+import timeit
+import uuid
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from typing import List
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from app.responses import ORJSONResponse
+from app.schemas.session import SessionResponse
+
+LIST_SIZES = [3, 50, 1000]
+
+DEVICE_INFO = {
+    "user_agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36",
+    "device_type": "desktop",
+    "browser": "Chrome",
+    "operating_system": "Windows",
+    "accept_language": "en-US,en;q=0.9",
+    "ip_address": "203.0.113.7",
+}
+
+
+def make_rows(count: int) -> list:
+    """Stand-ins for UserSession rows as returned by the ORM"""
+    start = datetime(2024, 5, 1, 9, 30, 15, 123456)
+    return [
+        SimpleNamespace(
+            id=str(uuid.uuid4()),
+            device_info=dict(DEVICE_INFO),
+            ip_address="203.0.113.7",
+            created_at=start + timedelta(minutes=i),
+            last_activity=start + timedelta(minutes=i, seconds=42),
+        )
+        for i in range(count)
+    ]
+
+
+def legacy(rows) -> bytes:
+    """Model per row, then FastAPI's jsonable_encoder and json.dumps"""
+    models = [
+        SessionResponse(
+            session_id=str(row.id),
+            device_info=row.device_info,
+            ip_address=row.ip_address,
+            created_at=row.created_at,
+            last_activity=row.last_activity,
+            is_current=False,
+        )
+        for row in rows
+    ]
+    return json.dumps(jsonable_encoder(models), separators=(",", ":")).encode()
+
+
+REVALIDATE = TypeAdapter(List[SessionResponse])
+
+
+def revalidated(rows) -> bytes:
+    """Legacy path plus the response_model validation FastAPI ran on top"""
+    models = [
+        SessionResponse(
+            session_id=str(row.id),
+            device_info=row.device_info,
+            ip_address=row.ip_address,
+            created_at=row.created_at,
+            last_activity=row.last_activity,
+            is_current=False,
+        )
+        for row in rows
+    ]
+    validated = REVALIDATE.validate_python(jsonable_encoder(models))
+    return json.dumps(jsonable_encoder(validated), separators=(",", ":")).encode()
+
+
+def fast(rows) -> bytes:
+    """Plain dicts rendered by ORJSONResponse"""
+    return ORJSONResponse([
+        {
+            "session_id": row.id,
+            "device_info": row.device_info,
+            "ip_address": row.ip_address,
+            "created_at": row.created_at,
+            "last_activity": row.last_activity,
+            "is_current": False,
+        }
+        for row in rows
+    ]).body
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=200, help="serializations per variant and list size")
+    args = parser.parse_args()
+
+    variants = {
+        "model + json.dumps": legacy,
+        "model + revalidate": revalidated,
+        "dicts + orjson": fast,
+    }
+    for size in LIST_SIZES:
+        rows = make_rows(size)
+        expected = json.loads(legacy(rows))
+        for serialize in variants.values():
+            assert json.loads(serialize(rows)) == expected, serialize.__name__
+
+        repeat = max(1, args.repeat * 50 // size)
+        print(f"{size} sessions ({len(legacy(rows))} bytes)")
+        baseline = None
+        for name, serialize in variants.items():
+            seconds = timeit.timeit(lambda: serialize(rows), number=repeat)
+            per_call_us = seconds / repeat * 1e6
+            baseline = baseline or per_call_us
+            print(f"  {name:<20} {per_call_us:10.1f} us/list  {baseline / per_call_us:5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Startup benchmark: time from process start to the first served request.
+
+Measures the bare import of ``app.main`` in a fresh interpreter, then boots
+uvicorn repeatedly against a fresh SQLite database with warmup disabled and
+enabled. For each boot it records when /health first answers and how long
+the first and second authenticated requests take; with warmup on, the
+first request should cost about the same as the second.
+
+    cd backend
+    python -m benchmarks.startup --runs 5
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+from benchmarks.http_load import USER_AGENTS, create_database, free_port, start_server
+
+IMPORT_SNIPPET = "import time; start = time.perf_counter(); import app.main; print(time.perf_counter() - start)"
+
+
+def headers(index: int) -> dict:
+    # A new account per request, so both requests take the same cold path
+    return {
+        "x-user-id": f"auth0|startup-{index}",
+        "x-user-email": f"startup{index}@example.com",
+        "x-user-name": f"Startup {index}",
+        "user-agent": USER_AGENTS[0],
+    }
+
+
+def import_seconds() -> float:
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_SNIPPET], capture_output=True, text=True, check=True
+    ).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def timed_get(client: httpx.Client, path: str, index: int) -> float:
+    start = time.perf_counter()
+    client.get(path, headers=headers(index)).raise_for_status()
+    return time.perf_counter() - start
+
+
+def boot_once(warmup: bool, timeout: float = 30) -> dict:
+    db_path = create_database()
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    started = time.perf_counter()
+    server = start_server(db_path, port, WARMUP_ENABLED=str(warmup).lower())
+    try:
+        with httpx.Client(base_url=base_url, timeout=5) as client:
+            while True:
+                if server.poll() is not None:
+                    raise RuntimeError(f"server exited with code {server.returncode}")
+                if time.perf_counter() - started > timeout:
+                    raise RuntimeError("server did not become healthy in time")
+                try:
+                    if client.get("/health").status_code == 200:
+                        break
+                except httpx.TransportError:
+                    time.sleep(0.005)
+            ready = time.perf_counter() - started
+            first = timed_get(client, "/api/users/me", 1)
+            second = timed_get(client, "/api/users/me", 2)
+    finally:
+        server.terminate()
+        server.wait()
+    return {"ready": ready, "first_served": ready + first, "first": first, "second": second}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="boots per variant")
+    args = parser.parse_args()
+
+    imports = [import_seconds() for _ in range(args.runs)]
+    print(f"import app.main: median {statistics.median(imports) * 1000:.0f} ms over {args.runs} runs")
+
+    print(f"{'warmup':8} {'ready ms':>9} {'1st served ms':>14} {'1st req ms':>11} {'2nd req ms':>11}")
+    for warmup in (False, True):
+        runs = [boot_once(warmup) for _ in range(args.runs)]
+        median = {key: statistics.median(run[key] for run in runs) * 1000 for key in runs[0]}
+        print(f"{'on' if warmup else 'off':8} {median['ready']:>9.0f} {median['first_served']:>14.0f} "
+              f"{median['first']:>11.1f} {median['second']:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Micro-benchmark for user-agent classification.
+
+Compares the previous substring-scan parsers with the single-pass
+classifier (uncached and behind its LRU cache) over a corpus of real
+user-agent strings, replayed in a skewed order the way production traffic
+repeats a small set of agents. Also checks that all three agree.
+
+    cd backend
+    python -m benchmarks.user_agents --requests 200000
+"""
+import argparse
+import random
+import timeit
+
+from app.services.user_agent import classify_user_agent
+
+CORPUS = [
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36 Edg/124.0.2478.67",
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:125.0) Gecko/20100101 Firefox/125.0",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.4.1 Safari/605.1.15",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 14.4; rv:125.0) Gecko/20100101 Firefox/125.0",
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (X11; Ubuntu; Linux x86_64; rv:125.0) Gecko/20100101 Firefox/125.0",
+    "Mozilla/5.0 (iPhone; CPU iPhone OS 17_4_1 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.4.1 Mobile/15E148 Safari/604.1",
+    "Mozilla/5.0 (iPhone; CPU iPhone OS 17_4 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) CriOS/124.0.6367.88 Mobile/15E148 Safari/604.1",
+    "Mozilla/5.0 (iPad; CPU OS 17_4_1 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.4.1 Mobile/15E148 Safari/604.1",
+    "Mozilla/5.0 (Linux; Android 14; SM-S918B) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.6367.82 Mobile Safari/537.36",
+    "Mozilla/5.0 (Linux; Android 14; Pixel 8 Pro) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.6367.82 Mobile Safari/537.36",
+    "Mozilla/5.0 (Linux; Android 13; SM-X710) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.6367.82 Safari/537.36",
+    "Mozilla/5.0 (Android 14; Mobile; rv:125.0) Gecko/125.0 Firefox/125.0",
+    "Mozilla/5.0 (Linux; Android 10; K) AppleWebKit/537.36 (KHTML, like Gecko) SamsungBrowser/24.0 Chrome/117.0.0.0 Mobile Safari/537.36",
+    "Mozilla/5.0 (X11; CrOS x86_64 14541.0.0) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36 OPR/109.0.0.0",
+    "Mozilla/5.0 (compatible; Googlebot/2.1; +http://www.google.com/bot.html)",
+    "curl/8.4.0",
+    "python-requests/2.31.0",
+    "PostmanRuntime/7.37.3",
+]
+
+
+def legacy_classify(user_agent: str):
+    """The three substring-scan parsers previously in DeviceService"""
+    ua_lower = user_agent.lower()
+    if any(mobile in ua_lower for mobile in ["mobile", "android", "iphone"]):
+        device_type = "mobile"
+    elif any(tablet in ua_lower for tablet in ["tablet", "ipad"]):
+        device_type = "tablet"
+    else:
+        device_type = "desktop"
+
+    ua_lower = user_agent.lower()
+    if "chrome" in ua_lower and "edg" not in ua_lower:
+        browser = "Chrome"
+    elif "firefox" in ua_lower:
+        browser = "Firefox"
+    elif "safari" in ua_lower and "chrome" not in ua_lower:
+        browser = "Safari"
+    elif "edg" in ua_lower:
+        browser = "Edge"
+    else:
+        browser = "Unknown"
+
+    ua_lower = user_agent.lower()
+    if "windows" in ua_lower:
+        os = "Windows"
+    elif "mac" in ua_lower and "iphone" not in ua_lower:
+        os = "macOS"
+    elif "linux" in ua_lower:
+        os = "Linux"
+    elif "android" in ua_lower:
+        os = "Android"
+    elif "iphone" in ua_lower or "ios" in ua_lower:
+        os = "iOS"
+    else:
+        os = "Unknown"
+    return browser, os, device_type
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200_000, help="classifications per variant")
+    args = parser.parse_args()
+
+    uncached = classify_user_agent.__wrapped__
+    for user_agent in CORPUS:
+        expected = legacy_classify(user_agent)
+        assert tuple(uncached(user_agent)) == expected, (user_agent, expected)
+
+    # Zipf-like skew: a few agents account for most requests
+    weights = [1 / (rank + 1) for rank in range(len(CORPUS))]
+    traffic = random.Random(0).choices(CORPUS, weights=weights, k=args.requests)
+
+    classify_user_agent.cache_clear()
+    variants = {
+        "legacy substring scans": legacy_classify,
+        "single pass, uncached": uncached,
+        "single pass, LRU cached": classify_user_agent,
+    }
+    baseline = None
+    for name, classify in variants.items():
+        seconds = timeit.timeit(lambda: [classify(ua) for ua in traffic], number=1)
+        per_call_ns = seconds / len(traffic) * 1e9
+        baseline = baseline or per_call_ns
+        print(f"{name:<26} {per_call_ns:8.0f} ns/call  {baseline / per_call_ns:5.1f}x")
+    print(f"cache: {classify_user_agent.cache_info()}")
+
+
+if __name__ == "__main__":
+    main()
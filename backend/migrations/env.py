@@ -8,6 +8,7 @@ import sys
 # Add the app directory to the Python path
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
+from app.config import settings
 from app.database import Base
 from app.models import user  # Import all models
 import os
@@ -31,7 +32,7 @@ target_metadata = Base.metadata
 # ... etc.
 
 def get_url():
-    return os.getenv("DATABASE_URL", "sqlite:///./auth_app.db")
+    return settings.database_url
 
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode."""
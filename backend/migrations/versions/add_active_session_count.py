@@ -0,0 +1,29 @@
+"""add_active_session_count
+
+Revision ID: add_active_session_count
+Revises: add_session_archive
+Create Date: 2026-10-18 22:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = 'add_active_session_count'
+down_revision = 'add_session_archive'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # Per-user device slots in use; the limit check reads this instead of counting rows
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.add_column(sa.Column('active_session_count', sa.Integer(), nullable=False, server_default='0'))
+    op.execute(
+        "UPDATE users SET active_session_count = ("
+        "SELECT COUNT(*) FROM user_sessions "
+        "WHERE user_sessions.user_id = users.id AND user_sessions.is_active = true)"
+    )
+
+def downgrade():
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.drop_column('active_session_count')
@@ -0,0 +1,180 @@
+"""add_device_profiles
+
+Revision ID: add_device_profiles
+Revises: add_active_session_count
+Create Date: 2026-10-18 23:00:00.000000
+
+"""
+import hashlib
+import json
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = 'add_device_profiles'
+down_revision = 'add_active_session_count'
+branch_labels = None
+depends_on = None
+
+# Rows read and rewritten per batch during the backfill
+BATCH_SIZE = 5000
+
+# Partial indexes on user_sessions; a batch rebuild on SQLite would
+# reflect them without their WHERE clause, so they are dropped and recreated
+PARTIAL_INDEXES = [
+    ('ix_user_sessions_user_active_activity', ['user_id', 'is_active', 'last_activity'], 'is_active', 'is_active = 1'),
+    ('ix_user_sessions_active_activity', ['last_activity'], 'is_active', 'is_active = 1'),
+    ('ix_user_sessions_inactive_activity', ['last_activity'], 'NOT is_active', 'is_active = 0'),
+]
+
+device_profiles = sa.table(
+    'device_profiles',
+    sa.column('id', sa.Integer()),
+    sa.column('profile_hash', sa.String()),
+    sa.column('browser', sa.String()),
+    sa.column('os', sa.String()),
+    sa.column('device_type', sa.String()),
+    sa.column('attributes', sa.JSON()),
+)
+
+def _session_table(name):
+    # Both device columns exist while the data is being moved
+    return sa.table(
+        name,
+        sa.column('id', sa.String()),
+        sa.column('ip_address', sa.String()),
+        sa.column('device_info', sa.JSON()),
+        sa.column('device_profile_id', sa.Integer()),
+    )
+
+def _normalize(device_info):
+    # Frozen copy of app.services.device_profiles.normalize_profile
+    attributes = {key: value for key, value in device_info.items() if key != 'ip_address'}
+    canonical = json.dumps(attributes, sort_keys=True, separators=(',', ':'))
+    return attributes, hashlib.sha256(canonical.encode()).hexdigest()
+
+def _batches(bind, table, *columns):
+    """Yield (id, *columns) rows of a table in primary-key order"""
+    last_id = None
+    while True:
+        statement = sa.select(table.c.id, *columns).order_by(table.c.id).limit(BATCH_SIZE)
+        if last_id is not None:
+            statement = statement.where(table.c.id > last_id)
+        rows = bind.execute(statement).fetchall()
+        if not rows:
+            return
+        last_id = rows[-1][0]
+        yield rows
+
+def _backfill_profiles(bind, table_name):
+    sessions = _session_table(table_name)
+    profile_ids = dict(bind.execute(sa.select(device_profiles.c.profile_hash, device_profiles.c.id)).fetchall())
+    for rows in _batches(bind, sessions, sessions.c.device_info):
+        updates = []
+        for session_id, device_info in rows:
+            if isinstance(device_info, str):
+                device_info = json.loads(device_info)
+            attributes, profile_hash = _normalize(device_info or {})
+            if profile_hash not in profile_ids:
+                bind.execute(device_profiles.insert().values(
+                    profile_hash=profile_hash,
+                    browser=attributes.get('browser'),
+                    os=attributes.get('os', attributes.get('operating_system')),
+                    device_type=attributes.get('device_type'),
+                    attributes=attributes,
+                ))
+                profile_ids[profile_hash] = bind.execute(
+                    sa.select(device_profiles.c.id).where(device_profiles.c.profile_hash == profile_hash)
+                ).scalar()
+            updates.append({'b_id': session_id, 'b_profile_id': profile_ids[profile_hash]})
+        bind.execute(
+            sessions.update()
+            .where(sessions.c.id == sa.bindparam('b_id'))
+            .values(device_profile_id=sa.bindparam('b_profile_id')),
+            updates,
+        )
+
+def _restore_device_info(bind, table_name):
+    sessions = _session_table(table_name)
+    attributes = dict(bind.execute(sa.select(device_profiles.c.id, device_profiles.c.attributes)).fetchall())
+    for rows in _batches(bind, sessions, sessions.c.device_profile_id, sessions.c.ip_address):
+        updates = []
+        for session_id, profile_id, ip_address in rows:
+            device_info = attributes[profile_id]
+            if isinstance(device_info, str):
+                device_info = json.loads(device_info)
+            if 'user_agent' in device_info:
+                # SessionService documents carried the IP; put it back
+                device_info = {**device_info, 'ip_address': ip_address}
+            updates.append({'b_id': session_id, 'b_device_info': device_info})
+        bind.execute(
+            sessions.update()
+            .where(sessions.c.id == sa.bindparam('b_id'))
+            .values(device_info=sa.bindparam('b_device_info')),
+            updates,
+        )
+
+def _drop_partial_indexes():
+    for name, _, _, _ in PARTIAL_INDEXES:
+        op.drop_index(name, 'user_sessions')
+
+def _create_partial_indexes():
+    for name, columns, postgresql_where, sqlite_where in PARTIAL_INDEXES:
+        op.create_index(
+            name,
+            'user_sessions',
+            columns,
+            postgresql_where=sa.text(postgresql_where),
+            sqlite_where=sa.text(sqlite_where),
+        )
+
+def upgrade():
+    # Distinct device documents, shared by every session that reports one
+    op.create_table(
+        'device_profiles',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('profile_hash', sa.String(length=64), nullable=False),
+        sa.Column('browser', sa.String(), nullable=True),
+        sa.Column('os', sa.String(), nullable=True),
+        sa.Column('device_type', sa.String(), nullable=True),
+        sa.Column('attributes', sa.JSON(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('profile_hash'),
+    )
+    op.add_column('user_sessions', sa.Column('device_profile_id', sa.Integer(), nullable=True))
+    op.add_column('user_sessions_archive', sa.Column('device_profile_id', sa.Integer(), nullable=True))
+
+    bind = op.get_bind()
+    _backfill_profiles(bind, 'user_sessions')
+    _backfill_profiles(bind, 'user_sessions_archive')
+
+    _drop_partial_indexes()
+    with op.batch_alter_table('user_sessions') as batch_op:
+        batch_op.alter_column('device_profile_id', existing_type=sa.Integer(), nullable=False)
+        batch_op.create_foreign_key('fk_user_sessions_device_profile_id', 'device_profiles', ['device_profile_id'], ['id'])
+        batch_op.create_index('ix_user_sessions_device_profile_id', ['device_profile_id'])
+        batch_op.drop_column('device_info')
+    _create_partial_indexes()
+    with op.batch_alter_table('user_sessions_archive') as batch_op:
+        batch_op.alter_column('device_profile_id', existing_type=sa.Integer(), nullable=False)
+        batch_op.drop_column('device_info')
+
+def downgrade():
+    op.add_column('user_sessions', sa.Column('device_info', sa.JSON(), nullable=True))
+    op.add_column('user_sessions_archive', sa.Column('device_info', sa.JSON(), nullable=True))
+
+    bind = op.get_bind()
+    _restore_device_info(bind, 'user_sessions')
+    _restore_device_info(bind, 'user_sessions_archive')
+
+    _drop_partial_indexes()
+    with op.batch_alter_table('user_sessions') as batch_op:
+        batch_op.alter_column('device_info', existing_type=sa.JSON(), nullable=False)
+        batch_op.drop_index('ix_user_sessions_device_profile_id')
+        batch_op.drop_constraint('fk_user_sessions_device_profile_id', type_='foreignkey')
+        batch_op.drop_column('device_profile_id')
+    _create_partial_indexes()
+    with op.batch_alter_table('user_sessions_archive') as batch_op:
+        batch_op.alter_column('device_info', existing_type=sa.JSON(), nullable=False)
+        batch_op.drop_column('device_profile_id')
+    op.drop_table('device_profiles')
@@ -0,0 +1,37 @@
+"""add_active_session_indexes
+
+Revision ID: add_session_activity_index
+Revises: add_device_fingerprint
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = 'add_session_activity_index'
+down_revision = 'add_device_fingerprint'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # Per-user active-session lookups, limit checks and per-user expiry
+    op.create_index(
+        'ix_user_sessions_user_active_activity',
+        'user_sessions',
+        ['user_id', 'is_active', 'last_activity'],
+        postgresql_where=sa.text('is_active'),
+        sqlite_where=sa.text('is_active = 1'),
+    )
+    # Global expiry sweep over active sessions
+    op.create_index(
+        'ix_user_sessions_active_activity',
+        'user_sessions',
+        ['last_activity'],
+        postgresql_where=sa.text('is_active'),
+        sqlite_where=sa.text('is_active = 1'),
+    )
+
+def downgrade():
+    op.drop_index('ix_user_sessions_active_activity', 'user_sessions')
+    op.drop_index('ix_user_sessions_user_active_activity', 'user_sessions')
@@ -0,0 +1,48 @@
+"""add_session_archive
+
+Revision ID: add_session_archive
+Revises: add_session_activity_index
+Create Date: 2026-10-18 21:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = 'add_session_archive'
+down_revision = 'add_session_activity_index'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # Cold storage for inactive sessions past the retention age
+    op.create_table(
+        'user_sessions_archive',
+        sa.Column('id', sa.String(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('device_info', sa.JSON(), nullable=False),
+        sa.Column('device_fingerprint', sa.String(), nullable=False),
+        sa.Column('ip_address', sa.String(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('last_activity', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('archived_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(
+        'ix_user_sessions_archive_user_created',
+        'user_sessions_archive',
+        ['user_id', 'created_at'],
+    )
+    # Lets the retention job find archivable rows without scanning active ones
+    op.create_index(
+        'ix_user_sessions_inactive_activity',
+        'user_sessions',
+        ['last_activity'],
+        postgresql_where=sa.text('NOT is_active'),
+        sqlite_where=sa.text('is_active = 0'),
+    )
+
+def downgrade():
+    op.drop_index('ix_user_sessions_inactive_activity', 'user_sessions')
+    op.drop_index('ix_user_sessions_archive_user_created', 'user_sessions_archive')
+    op.drop_table('user_sessions_archive')
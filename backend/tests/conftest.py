@@ -0,0 +1,5 @@
+import os
+
+# Keep app settings off the committed auth_app.db; tests build their own engines
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SESSION_SWEEPER_ENABLED", "false")
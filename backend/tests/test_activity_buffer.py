@@ -0,0 +1,48 @@
+import asyncio
+from datetime import datetime, timedelta
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from app.database import Base
+from app.models.session import DeviceProfile, UserSession
+from app.models.user import User
+from app.services.activity_buffer import ActivityBuffer
+
+IST_OFFSET = timedelta(hours=5, minutes=30)
+
+async def _touch(tmp_path, last_activity: datetime, heartbeat: datetime) -> datetime:
+    """Store a session with last_activity, flush one heartbeat, return the stored value"""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'activity.db'}")
+    try:
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+        session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        async with session_factory() as db:
+            db.add(User(id=1, auth0_user_id="auth0|1", email="1@example.com", full_name="Test"))
+            db.add(DeviceProfile(id=1, profile_hash="0" * 64, attributes={}))
+            db.add(UserSession(
+                id="s1", user_id=1, session_token="t1", device_profile_id=1,
+                device_fingerprint="f", ip_address="127.0.0.1", is_active=True,
+                created_at=last_activity, last_activity=last_activity
+            ))
+            await db.commit()
+
+        buffer = ActivityBuffer(session_factory=session_factory)
+        buffer.record(1, "s1", at=heartbeat)
+        await buffer.flush()
+
+        async with session_factory() as db:
+            return (await db.execute(select(UserSession.last_activity))).scalar_one()
+    finally:
+        await engine.dispose()
+
+def test_heartbeat_moves_last_activity_forward(tmp_path):
+    now = datetime.utcnow()
+    stored = asyncio.run(_touch(tmp_path, now - timedelta(minutes=20), now))
+    assert stored == now
+
+def test_heartbeat_does_not_move_ist_row_backwards(tmp_path):
+    now = datetime.utcnow()
+    ist_created = now + IST_OFFSET
+    stored = asyncio.run(_touch(tmp_path, ist_created, now))
+    assert stored == ist_created
@@ -0,0 +1,124 @@
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import jwt
+import pytest
+from cryptography.hazmat.primitives.asymmetric import rsa
+from app.services import auth
+from app.services.auth import Auth0Validator
+
+DOMAIN = "tenant.example.com"
+AUDIENCE = "https://api.example.com"
+
+class JWKSServer:
+    """Local stand-in for the tenant's JWKS endpoint, counting fetches"""
+
+    def __init__(self):
+        self.keys = {}
+        self.fetches = 0
+        self.delay = 0.0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.fetches += 1
+                time.sleep(server.delay)
+                body = json.dumps({"keys": [
+                    {**json.loads(jwt.algorithms.RSAAlgorithm.to_jwk(key.public_key())), "kid": kid}
+                    for kid, key in server.keys.items()
+                ]}).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self._httpd.server_address[1]}/.well-known/jwks.json"
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+
+    def rotate(self, kid: str) -> None:
+        """Publish a new key under kid, replacing every previous one"""
+        self.keys = {kid: rsa.generate_private_key(public_exponent=65537, key_size=2048)}
+
+    def sign(self, kid: str, **claims) -> str:
+        now = int(time.time())
+        payload = {"sub": "auth0|1", "aud": AUDIENCE, "iss": f"https://{DOMAIN}/", "iat": now, "exp": now + 3600}
+        payload.update(claims)
+        payload = {name: value for name, value in payload.items() if value is not None}
+        return jwt.encode(payload, self.keys[kid], algorithm="RS256", headers={"kid": kid})
+
+    def close(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+@pytest.fixture
+def jwks_server():
+    server = JWKSServer()
+    server.rotate("key-1")
+    yield server
+    server.close()
+
+def make_validator(server: JWKSServer, jwks_ttl: int = 600) -> Auth0Validator:
+    return Auth0Validator(domain=DOMAIN, audience=AUDIENCE, jwks_url=server.url, jwks_ttl=jwks_ttl, token_cache_size=100)
+
+def test_verified_token_is_cached(jwks_server):
+    validator = make_validator(jwks_server)
+    token = jwks_server.sign("key-1")
+    assert validator.verify_token(token).sub == "auth0|1"
+    assert validator.verify_token(token).sub == "auth0|1"
+    assert validator._verified_tokens.hits == 1
+    assert jwks_server.fetches == 1
+
+def test_rotated_kid_triggers_refresh(jwks_server, monkeypatch):
+    monkeypatch.setattr(auth, "UNKNOWN_KID_REFRESH_INTERVAL", 0)
+    validator = make_validator(jwks_server)
+    assert validator.verify_token(jwks_server.sign("key-1")) is not None
+
+    jwks_server.rotate("key-2")
+    assert validator.verify_token(jwks_server.sign("key-2")) is not None
+    assert jwks_server.fetches == 2
+    assert set(validator._signing_keys) == {"key-2"}
+
+def test_unknown_kid_refresh_is_rate_limited(jwks_server):
+    validator = make_validator(jwks_server)
+    assert validator.verify_token(jwks_server.sign("key-1")) is not None
+    jwks_server.rotate("key-2")
+    for _ in range(5):
+        assert validator.verify_token(jwks_server.sign("key-2")) is None
+    assert jwks_server.fetches == 1
+
+def test_cold_start_fetches_once(jwks_server):
+    jwks_server.delay = 0.2
+    validator = make_validator(jwks_server)
+    with ThreadPoolExecutor(max_workers=10) as pool:
+        keys = list(pool.map(validator.get_signing_key, ["key-1"] * 10))
+    assert all(key is not None for key in keys)
+    assert jwks_server.fetches == 1
+
+def test_expired_keys_refresh_in_background(jwks_server):
+    validator = make_validator(jwks_server, jwks_ttl=1)
+    stale = validator.get_signing_key("key-1")
+    time.sleep(1.1)
+    # Served from the expired map while the refresh runs
+    assert validator.get_signing_key("key-1") is stale
+    deadline = time.monotonic() + 5
+    while jwks_server.fetches < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert jwks_server.fetches == 2
+
+def test_empty_jwks_is_cached(jwks_server):
+    jwks_server.keys = {}
+    validator = make_validator(jwks_server)
+    for _ in range(5):
+        assert validator.get_signing_key("key-1") is None
+    assert jwks_server.fetches == 1
+
+def test_token_without_exp_is_rejected(jwks_server, caplog):
+    validator = make_validator(jwks_server)
+    assert validator.verify_token(jwks_server.sign("key-1", exp=None)) is None
+    assert 'missing the "exp" claim' in caplog.text
@@ -0,0 +1,44 @@
+import shutil
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+import pytest
+from alembic import command
+from alembic.config import Config
+from app.config import settings
+from benchmarks.query_plans import hot_queries, query_plan, seed_rows
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+# The initial revision is a diff against an existing database and
+# update_models is a stale branch, so the migrations are run from the schema
+# of the shipped development database, which is stamped add_device_fingerprint
+BASE_REVISION = "add_device_fingerprint"
+
+@pytest.fixture(scope="module")
+def migrated_db(tmp_path_factory):
+    """A database upgraded by the migrations, seeded with mostly inactive sessions"""
+    path = tmp_path_factory.mktemp("plans") / "plans.db"
+    shutil.copyfile(BACKEND_DIR / "auth_app.db", path)
+    conn = sqlite3.connect(path)
+    conn.execute("DELETE FROM user_sessions")
+    conn.execute("DELETE FROM users")
+    conn.commit()
+
+    config = Config()
+    config.set_main_option("script_location", str(BACKEND_DIR / "migrations"))
+    # env.py reads the URL from the settings
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr(settings, "database_url", f"sqlite:///{path}")
+        command.upgrade(config, f"{BASE_REVISION}@head")
+    seed_rows(conn, 20_000, datetime.utcnow())
+    yield conn
+    conn.close()
+
+@pytest.mark.parametrize("name", sorted(hot_queries(datetime.utcnow())))
+def test_hot_query_uses_its_index(migrated_db, name):
+    statement, expected = hot_queries(datetime.utcnow())[name]
+    plan = query_plan(migrated_db, statement)
+    assert "SCAN user_sessions" not in plan
+    for fragment in expected:
+        assert fragment in plan
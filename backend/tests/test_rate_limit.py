@@ -0,0 +1,35 @@
+import asyncio
+import pytest
+from fakeredis import aioredis
+from app.services.rate_limit import MemoryTokenBuckets, RateLimit, RedisTokenBuckets, SessionRateLimiter
+
+@pytest.fixture(params=["memory", "redis"])
+def limiter(request):
+    if request.param == "memory":
+        backend = MemoryTokenBuckets()
+    else:
+        backend = RedisTokenBuckets(aioredis.FakeRedis(decode_responses=True))
+    # Slow refill, so no token comes back while a test runs
+    return SessionRateLimiter(backend, user_limit=RateLimit(0.01, 2), ip_limit=RateLimit(0.01, 1))
+
+def test_user_bucket_is_enforced(limiter):
+    async def run():
+        return [await limiter.check("user-1", f"10.0.0.{i}") for i in range(3)]
+
+    first, second, third = asyncio.run(run())
+    assert first == second == 0
+    assert third > 0
+    assert limiter.throttled == {"user": 1}
+
+def test_ip_rejection_leaves_user_bucket_alone(limiter):
+    async def run():
+        # Another user used up the shared IP's only token
+        assert await limiter.check("user-2", "10.0.0.1") == 0
+        blocked = [await limiter.check("user-1", "10.0.0.1") for _ in range(5)]
+        elsewhere = [await limiter.check("user-1", f"10.0.1.{i}") for i in range(2)]
+        return blocked, elsewhere
+
+    blocked, elsewhere = asyncio.run(run())
+    assert all(wait > 0 for wait in blocked)
+    assert elsewhere == [0, 0]
+    assert limiter.throttled == {"ip": 5}
@@ -0,0 +1,53 @@
+import asyncio
+from datetime import datetime, timedelta
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from app.database import Base
+from app.models.session import ArchivedSession, DeviceProfile, UserSession
+from app.models.user import User
+from app.services.retention import SessionArchiver
+from app.services.session_export import SessionExporter
+
+async def _export(tmp_path, archive_after_first_page: bool = False):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'export.db'}")
+    try:
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+        session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        now = datetime.utcnow()
+        old = now - timedelta(days=365)
+        async with session_factory() as db:
+            db.add(User(id=1, auth0_user_id="auth0|1", email="1@example.com", full_name="Test"))
+            db.add(DeviceProfile(id=1, profile_hash="0" * 64, browser="Firefox", attributes={"browser": "Firefox"}))
+            for i, (is_active, at) in enumerate([(True, now), (False, now), (False, old), (False, old), (True, now)]):
+                db.add(UserSession(
+                    id=f"s{i}", user_id=1, session_token=f"t{i}", device_profile_id=1,
+                    device_fingerprint="f", ip_address="127.0.0.1", is_active=is_active,
+                    created_at=at, last_activity=at
+                ))
+            db.add(ArchivedSession(
+                id="s5", user_id=1, device_profile_id=1, device_fingerprint="f",
+                ip_address="127.0.0.1", created_at=old, last_activity=old
+            ))
+            await db.commit()
+
+        archiver = SessionArchiver(session_factory=session_factory, retention_days=30, pause_ms=0)
+        exported = []
+        async for row in SessionExporter(session_factory=session_factory, page_size=2).rows():
+            exported.append((row.id, row.is_active))
+            if archive_after_first_page and len(exported) == 2:
+                # s2 and s3 move to the archive while the export runs
+                assert await archiver.run() == 2
+        return exported
+    finally:
+        await engine.dispose()
+
+def test_export_includes_archived_sessions(tmp_path):
+    exported = asyncio.run(_export(tmp_path))
+    assert exported == [
+        ("s0", True), ("s1", False), ("s2", False), ("s3", False), ("s4", True), ("s5", False)
+    ]
+
+def test_session_archived_mid_export_is_exported_once(tmp_path):
+    exported = asyncio.run(_export(tmp_path, archive_after_first_page=True))
+    assert [session_id for session_id, _ in exported] == ["s0", "s1", "s2", "s3", "s4", "s5"]
@@ -0,0 +1,56 @@
+import asyncio
+import pytest
+from fakeredis import aioredis
+from app.services.session_store import LOADED_MARKER, ActiveSessionStore
+
+@pytest.fixture
+def store():
+    return ActiveSessionStore(aioredis.FakeRedis(decode_responses=True), ttl_seconds=60)
+
+def test_reserve_needs_hydration_on_cold_hash(store):
+    async def run():
+        before = await store.reserve(1, "s1", "Firefox", limit=3)
+        sessions = await store.get_sessions(1)
+        await store.hydrate(1, {})
+        return before, sessions, await store.get_sessions(1), await store.reserve(1, "s1", "Firefox", limit=3)
+
+    before, cold, hydrated, after = asyncio.run(run())
+    assert before is None
+    assert cold is None
+    # Only the marker: loaded, with no active sessions
+    assert hydrated == {}
+    assert after is True
+
+def test_reserve_enforces_limit(store):
+    async def run():
+        await store.hydrate(1, {"s1": "Firefox", "s2": "Chrome"})
+        results = [await store.reserve(1, session_id, "Safari", limit=3) for session_id in ("s3", "s4")]
+        forced = await store.reserve(1, "s5", "Safari", limit=3, force=True)
+        return results, forced, await store.get_sessions(1)
+
+    results, forced, sessions = asyncio.run(run())
+    assert results == [True, False]
+    assert forced is True
+    assert set(sessions) == {"s1", "s2", "s3", "s5"}
+
+def test_hydrate_is_idempotent(store):
+    async def run():
+        await store.hydrate(1, {"s1": "Firefox"})
+        await store.reserve(1, "s2", "Chrome", limit=3)
+        # A late hydration from an older read must not clobber the hash
+        await store.hydrate(1, {"old": "Edge"})
+        return await store.get_sessions(1), await store.client.hget(store._key(1), LOADED_MARKER)
+
+    sessions, marker = asyncio.run(run())
+    assert sessions == {"s1": "Firefox", "s2": "Chrome"}
+    assert marker == "1"
+
+def test_removing_last_session_keeps_user_loaded(store):
+    async def run():
+        await store.hydrate(1, {"s1": "Firefox"})
+        await store.remove(1, ["s1"])
+        return await store.get_sessions(1), await store.client.ttl(store._key(1))
+
+    sessions, ttl = asyncio.run(run())
+    assert sessions == {}
+    assert 0 < ttl <= 60
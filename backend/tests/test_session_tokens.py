@@ -0,0 +1,28 @@
+import time
+import pytest
+from app.services.session_tokens import SessionTokenSigner
+
+@pytest.fixture
+def signer():
+    return SessionTokenSigner(secret_key="test-secret", ttl=3600)
+
+def test_issued_token_verifies(signer):
+    claims = signer.verify(signer.issue("s1", 7))
+    assert claims.session_id == "s1"
+    assert claims.user_id == 7
+    assert claims.expires_at > time.time()
+
+@pytest.mark.parametrize("token", [
+    "",
+    "garbage",
+    "s1.7.9999999999.é",
+    "s1.7.9999999999.ÿþ",
+    "sé.7.9999999999.abc",
+])
+def test_malformed_token_is_rejected(signer, token):
+    assert signer.verify(token) is None
+
+def test_tampered_token_is_rejected(signer):
+    token = signer.issue("s1", 7)
+    message, _, signature = token.rpartition(".")
+    assert signer.verify(message.replace(".7.", ".8.") + "." + signature) is None
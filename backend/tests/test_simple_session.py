@@ -0,0 +1,106 @@
+import asyncio
+from datetime import datetime
+from fakeredis import aioredis
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from app import database
+from app.database import Base, RoutingSession
+from app.models.session import DeviceProfile, UserSession
+from app.models.user import User
+from app.services.device_profiles import device_profiles
+from app.services.session_store import ActiveSessionStore
+from app.services.simple_session import SimpleSessionService
+
+async def _seed(engine, with_session: bool) -> None:
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    async with AsyncSession(engine) as db:
+        db.add(User(id=1, auth0_user_id="auth0|1", email="1@example.com", full_name="Test", active_session_count=int(with_session)))
+        db.add(DeviceProfile(id=1, profile_hash="0" * 64, browser="Firefox", attributes={"browser": "Firefox"}))
+        if with_session:
+            now = datetime.utcnow()
+            db.add(UserSession(
+                id="new-session", user_id=1, session_token="t1", device_profile_id=1,
+                device_fingerprint="f", ip_address="127.0.0.1", is_active=True,
+                created_at=now, last_activity=now
+            ))
+        await db.commit()
+
+async def _browsers_with_stale_replica(tmp_path, monkeypatch):
+    primary = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'primary.db'}")
+    # The replica has not caught up with the session created on the primary
+    replica = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'replica.db'}")
+    try:
+        await _seed(primary, with_session=True)
+        await _seed(replica, with_session=False)
+        monkeypatch.setattr(database, "async_engine", primary)
+        monkeypatch.setattr(database, "replica_engines", [replica])
+        session_factory = sessionmaker(
+            primary, class_=AsyncSession, sync_session_class=RoutingSession, expire_on_commit=False
+        )
+        store = ActiveSessionStore(aioredis.FakeRedis(decode_responses=True))
+        async with session_factory() as db:
+            returned = await SimpleSessionService(db, store=store).get_active_session_browsers(1)
+        return returned, await store.get_sessions(1)
+    finally:
+        await primary.dispose()
+        await replica.dispose()
+
+def test_cold_store_is_hydrated_from_primary(tmp_path, monkeypatch):
+    returned, stored = asyncio.run(_browsers_with_stale_replica(tmp_path, monkeypatch))
+    assert returned == {"new-session": "Firefox"}
+    assert stored == {"new-session": "Firefox"}
+
+CHROME = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36"
+
+async def _parallel_logins(tmp_path, monkeypatch, logins: int):
+    """Fire parallel creates, then parallel force-creates; return (results, active rows, counter) per round"""
+    engine = database.make_engine(f"sqlite+aiosqlite:///{tmp_path / 'logins.db'}", is_async=True)
+    try:
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+        session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        async with session_factory() as db:
+            db.add(User(id=1, auth0_user_id="auth0|1", email="1@example.com", full_name="Test"))
+            await db.commit()
+        monkeypatch.setattr(device_profiles, "session_factory", session_factory)
+        # Resolved up front so the logins race only on the session writes
+        await device_profiles.resolve({"browser": "Chrome", "os": "Windows", "device_type": "Desktop"})
+
+        async def login(force_session_id=None):
+            async with session_factory() as db:
+                user = await db.get(User, 1)
+                return await SimpleSessionService(db, store=None).create_session(
+                    user, CHROME, "127.0.0.1", force_session_id=force_session_id
+                )
+
+        async def state():
+            async with session_factory() as db:
+                active = await db.scalar(
+                    select(func.count()).select_from(UserSession).where(UserSession.is_active == True)
+                )
+                return active, await db.scalar(select(User.active_session_count))
+
+        rounds = []
+        results = await asyncio.gather(*(login() for _ in range(logins)))
+        rounds.append((results, *await state()))
+        targets = [result["session_id"] for result in results if result["status"] == "success"]
+        results = await asyncio.gather(*(
+            login(targets[i % len(targets)] if i % 2 else None) for i in range(logins)
+        ))
+        rounds.append((results, *await state()))
+        return rounds
+    finally:
+        await engine.dispose()
+
+def test_parallel_logins_respect_device_limit(tmp_path, monkeypatch):
+    rounds = asyncio.run(_parallel_logins(tmp_path, monkeypatch, logins=30))
+    for results, active, counter in rounds:
+        assert active <= 3
+        assert counter == active
+        assert all(result["status"] in ("success", "device_limit_exceeded", "session_not_found") for result in results)
+    (creates, active, _), (forces, _, _) = rounds
+    assert sum(result["status"] == "success" for result in creates) == active == 3
+    # Each force-create target can be taken over once
+    assert sum(result["status"] == "success" for result in forces) == 3
@@ -0,0 +1,9 @@
+from fastapi.testclient import TestClient
+from app.config import settings
+from app.main import app
+
+def test_startup_survives_unmigrated_database(monkeypatch):
+    # The test DATABASE_URL is an empty in-memory database: no users table
+    monkeypatch.setattr(settings, "warmup_enabled", True)
+    with TestClient(app) as client:
+        assert client.get("/health").json() == {"status": "healthy"}
@@ -1,6 +1,6 @@
 import { useEffect, useState } from "react";
 import { useUser } from "@auth0/nextjs-auth0/client";
-import { simpleApiClient } from "../lib/simple-api";
+import { simpleApiClient, currentSession } from "../lib/simple-api";
 
 export function useSessionValidator() {
   const { user } = useUser();
@@ -10,28 +10,70 @@ export function useSessionValidator() {
   useEffect(() => {
     if (!user) return;
 
+    const controller = new AbortController();
+    let streaming = false;
+    let loggedOut = false;
+
+    const markLoggedOut = (message?: string) => {
+      loggedOut = true;
+      setIsSessionValid(false);
+      setLogoutMessage(message || "You have been logged out from another device");
+    };
+
     const validateSession = async () => {
       try {
         const result = await simpleApiClient.validateSession(user);
 
         if (!result.valid) {
-          setIsSessionValid(false);
-          setLogoutMessage(
-            result.message || "You have been logged out from another device"
-          );
+          markLoggedOut(result.message);
         }
       } catch (error) {
         console.error("Session validation failed:", error);
       }
     };
 
-    // Check session validity every 30 seconds
-    const interval = setInterval(validateSession, 100000);
+    // The server pushes a "terminated" event the moment this session is
+    // ended, so an open stream costs no polling at all
+    const openStream = async () => {
+      const sessionId = currentSession.get();
+      if (!sessionId || streaming || loggedOut) return;
+
+      streaming = true;
+      try {
+        await simpleApiClient.streamSessionEvents(
+          sessionId,
+          user,
+          (event, data) => {
+            if (event === "terminated") markLoggedOut(data.message);
+          },
+          controller.signal
+        );
+      } catch (error) {
+        if (!controller.signal.aborted) {
+          console.warn("Session event stream failed, polling instead:", error);
+        }
+      } finally {
+        streaming = false;
+      }
+    };
+
+    // Poll only while no stream is open (e.g. before the session id is known)
+    const pollSession = () => {
+      if (!streaming && !loggedOut) validateSession();
+    };
+
+    const pollInterval = setInterval(pollSession, 100000);
+    const streamRetry = setInterval(openStream, 15000);
 
     // Initial check
     validateSession();
+    openStream();
 
-    return () => clearInterval(interval);
+    return () => {
+      controller.abort();
+      clearInterval(pollInterval);
+      clearInterval(streamRetry);
+    };
   }, [user]);
 
   const handleLogout = () => {
@@ -1,6 +1,6 @@
 import { useState, useEffect, useCallback } from 'react';
 import { useUser } from '@auth0/nextjs-auth0/client';
-import { simpleApiClient } from '../lib/simple-api';
+import { simpleApiClient, currentSession } from '../lib/simple-api';
 
 interface DeviceLimitState {
   isExceeded: boolean;
@@ -36,6 +36,7 @@ export function useSimpleSession() {
       
       if (response.status === 'success') {
         console.log('Session created successfully');
+        currentSession.set(response.session_id, response.session_token);
         setSessionCreated(true);
       }
     } catch (error) {
@@ -48,7 +49,8 @@ export function useSimpleSession() {
     
     try {
       console.log('Force creating session, terminating:', sessionId);
-      await simpleApiClient.forceCreateSession(sessionId, user);
+      const response = await simpleApiClient.forceCreateSession(sessionId, user);
+      currentSession.set(response.session_id, response.session_token);
       setDeviceLimitState({ isExceeded: false, sessions: [], maxDevices: 0 });
       setSessionCreated(true);
     } catch (error) {
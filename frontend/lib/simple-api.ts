@@ -53,8 +53,92 @@ class SimpleApiClient {
   }
 
   async validateSession(user: any) {
-    return this.request('/api/session/validate', {}, user);
+    // With a session token the server checks this exact session instead
+    // of matching the browser name against every active session
+    const token = currentSession.getToken();
+    const result = await this.request(
+      '/api/session/validate',
+      token ? { headers: { 'x-session-token': token } } : {},
+      user
+    );
+    if (result.session_token) currentSession.setToken(result.session_token);
+    return result;
+  }
+
+  /**
+   * Open the server-sent events stream for a session and call onEvent for
+   * each event. Uses fetch rather than EventSource so the auth headers can
+   * be sent. Resolves when the server ends the stream; rejects on errors.
+   */
+  async streamSessionEvents(
+    sessionId: string,
+    user: any,
+    onEvent: (event: string, data: any) => void,
+    signal: AbortSignal
+  ) {
+    const response = await fetch(
+      `${this.baseUrl}/api/session/events?session_id=${encodeURIComponent(sessionId)}`,
+      {
+        headers: {
+          Accept: 'text/event-stream',
+          'x-user-id': user.sub,
+          'x-user-email': user.email || '',
+          'x-user-name': user.name || '',
+        },
+        signal,
+      }
+    );
+
+    if (!response.ok || !response.body) {
+      throw new Error(`API Error: ${response.status}`);
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+
+    while (true) {
+      const { done, value } = await reader.read();
+      if (done) return;
+      buffer += decoder.decode(value, { stream: true });
+
+      let boundary = buffer.indexOf('\n\n');
+      while (boundary !== -1) {
+        const block = buffer.slice(0, boundary);
+        buffer = buffer.slice(boundary + 2);
+        boundary = buffer.indexOf('\n\n');
+
+        let event = 'message';
+        let data = '';
+        block.split('\n').forEach((line) => {
+          if (line.startsWith('event:')) event = line.slice(6).trim();
+          else if (line.startsWith('data:')) data += line.slice(5).trim();
+        });
+        if (data) onEvent(event, JSON.parse(data));
+      }
+    }
   }
 }
 
+const SESSION_ID_KEY = 'trivium_session_id';
+const SESSION_TOKEN_KEY = 'trivium_session_token';
+
+// Per-tab id and signed token of the session this tab created, used for
+// the events stream and for validation
+export const currentSession = {
+  get(): string | null {
+    return typeof window === 'undefined' ? null : window.sessionStorage.getItem(SESSION_ID_KEY);
+  },
+  set(sessionId: string, token?: string) {
+    window.sessionStorage.setItem(SESSION_ID_KEY, sessionId);
+    if (token) currentSession.setToken(token);
+  },
+  getToken(): string | null {
+    return typeof window === 'undefined' ? null : window.sessionStorage.getItem(SESSION_TOKEN_KEY);
+  },
+  setToken(token: string) {
+    window.sessionStorage.setItem(SESSION_TOKEN_KEY, token);
+  },
+};
+
 export const simpleApiClient = new SimpleApiClient();
\ No newline at end of file